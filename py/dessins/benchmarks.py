@@ -0,0 +1,252 @@
+'''Benchmarks for the real workloads of this package
+
+Run from the command line, for example
+    python -m dessins.benchmarks --output results.json
+    python -m dessins.benchmarks --quick --select relabel
+
+Each benchmark does its setup, and returns a function that does the
+work to be timed. Results are written as JSON, so that runs on
+different versions can be compared.
+
+>>> names = [name for name, func in BENCHMARKS]
+>>> 'product_top' in names and 'tower_A' in names
+True
+>>> report = run_benchmarks(select='cycles_A4', repeat=1)
+>>> [result['name'] for result in report['results']]
+['cycles_A4']
+'''
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+
+BENCHMARKS = []                 # List of (name, func) pairs.
+FORMAT_VERSION = 1
+
+
+def benchmark(name):
+    '''Decorator, that registers a benchmark.'''
+
+    def decorator(func):
+        BENCHMARKS.append((name, func))
+        return func
+
+    return decorator
+
+
+# Product construction.
+
+@benchmark('product_lazy_A7')
+def _():
+    from .work import A4
+    return lambda: A4 * A4 * A4 * A4 * A4 * A4 * A4
+
+
+@benchmark('product_array_A7')
+def _():
+    from .work import A4
+    A = A4.materialize()
+    return lambda: A * A * A * A * A * A * A
+
+
+@benchmark('product_power_A7')
+def _():
+    from .work import A4, power
+    return lambda: power(A4, 7).materialize()
+
+
+@benchmark('product_top')
+def _():
+    from .work import A_top, B_top
+    return lambda: A_top * B_top
+
+
+# Relabelling from a single root.
+
+@benchmark('relabel_lazy_A7')
+def _():
+    from .work import A4
+    AAA = A4 * A4 * A4 * A4 * A4 * A4 * A4
+    magic = sum(i * 7 ** i for i in range(7))
+    return lambda: sum(1 for i in AAA.iter_relabel(magic))
+
+
+@benchmark('relabel_top')
+def _():
+    from array import array
+    from .permtools import Relabel
+    from .work import A_top, B_top
+    product = A_top * B_top
+    out = array('L', [0]) * (2 * len(product))
+    relabel = Relabel(len(product))
+    return lambda: product.relabel_into(0, out, relabel)
+
+
+# Scans over all roots.
+
+@benchmark('scan_sizes_AAAA_0_A')
+def _():
+    from .computations import AAAA_0, A
+    product = AAAA_0 * A
+    return lambda: [
+        len(tuple(product.iter_relabel(i)))//2 for i in range(7)
+    ]
+
+
+@benchmark('components_AAAA_0_A')
+def _():
+    from .components import components
+    from .computations import AAAA_0, A
+    product = AAAA_0 * A
+    return lambda: components(product)
+
+
+@benchmark('components_top')
+def _():
+    from .components import components
+    from .work import A_top, B_top
+    product = A_top * B_top
+    return lambda: components(product)
+
+
+@benchmark('every_relabel_AAA_0')
+def _():
+    from .computations import AAA_0, every_relabel_of
+    return lambda: sorted(every_relabel_of(AAA_0))[0]
+
+
+@benchmark('canonical_AAAA_0')
+def _():
+    from .canonical import canonical_form
+    from .computations import AAAA_0
+    return lambda: canonical_form(AAAA_0)
+
+
+# Cycle decompositions.
+
+@benchmark('cycles_A4')
+def _():
+    from .permtools import iter_cycles
+    from .work import A4
+    alpha = tuple(map(A4.alpha, range(len(A4))))
+    return lambda: tuple(iter_cycles(alpha))
+
+
+@benchmark('cycles_AAAAA_0_A')
+def _():
+    from .permtools import iter_cycles
+    from .computations import AAAAA_0, A
+    alpha = tuple((AAAAA_0 * A).alpha_array)
+    return lambda: sum(1 for cycle in iter_cycles(alpha))
+
+
+@benchmark('component_cycles_AAAAA_0_A')
+def _():
+    from .permpairtools import iter_component_cycles
+    from .computations import AAAAA_0, A
+    product = AAAAA_0 * A
+    permpair = product.alpha_array, product.beta_array
+    return lambda: sum(1 for item in iter_component_cycles(permpair))
+
+
+# The power towers, up to 17640 edges.
+
+def _tower(name):
+
+    from .computations import A, B
+    from .decompose import decompose
+    base = dict(A=A, B=B)[name]
+
+    def doit():
+        # Multiply the new component by the base, five times.
+        top = base
+        for i in range(5):
+            product = top * base
+            top = decompose(product, interned={})[-1][0]
+        return len(product)
+
+    return doit
+
+
+@benchmark('tower_A')
+def _():
+    return _tower('A')
+
+
+@benchmark('tower_B')
+def _():
+    return _tower('B')
+
+
+def run_benchmarks(select=None, repeat=3, quick=False):
+    '''Return report (a dict) of timings for selected benchmarks.
+
+    If quick, skip the benchmarks that take seconds.
+    '''
+
+    slow = {'product_top', 'relabel_top', 'components_top'}
+    results = []
+    for name, func in BENCHMARKS:
+
+        if select and select not in name:
+            continue
+        if quick and name in slow:
+            continue
+
+        start = time.perf_counter()
+        work = func()
+        setup = time.perf_counter() - start
+
+        times = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            work()
+            times.append(time.perf_counter() - start)
+
+        results.append(dict(
+            name=name,
+            setup=setup,
+            times=times,
+            min=min(times),
+            median=statistics.median(times),
+        ))
+
+    return dict(
+        format_version=FORMAT_VERSION,
+        timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        python=sys.version,
+        platform=platform.platform(),
+        repeat=repeat,
+        results=results,
+    )
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--output', help='JSON file, default stdout')
+    parser.add_argument('--select', help='only names containing this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true',
+                        help='skip benchmarks that take seconds')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.select, args.repeat, args.quick)
+    for result in report['results']:
+        print('%-30s %10.4f s' % (result['name'], result['min']),
+              file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,7 +4,7 @@
 from .permtools import Relabel
 
 
-def iter_bfs(permpair, root):
+def iter_bfs(permpair, root, relabel=None):
     '''
     >>> p1 = tuple(map(int, '0123456789'))
     >>> p2 = tuple(map(int, '1439678502'))
@@ -14,10 +14,20 @@ def iter_bfs(permpair, root):
     >>> items = tuple(iter_bfs((p2, p3), 4))
     >>> str(items).replace(' ', '')
     '(1,2,3,1,4,5,6,3,7,0,8,6,9,7,2,8,5,4,0,9)'
+
+    Pass in relabel, to reuse it for many roots.
+    >>> relabel = Relabel(10)
+    >>> items = tuple(iter_bfs((p2, p3), 4, relabel))
+    >>> tuple(iter_bfs((p2, p3), 4, relabel)) == items
+    True
     '''
 
     size = len(permpair[0])
-    relabel = Relabel(size)
+    if relabel is None:
+        relabel = Relabel(size)
+    else:
+        relabel.reset()
+
     edge_zero = relabel.forward(root)
 
     for new_label in range(size):
@@ -0,0 +1,232 @@
+'''Binary files for permutation pairs
+
+A file is a fixed size header, followed by the alpha and beta values
+as unsigned little-endian integers, all of the same width.
+
+    magic       4 bytes     b'DESN'
+    version     uint16      FORMAT_VERSION
+    width       uint8       bytes per value: 1, 2, 4 or 8
+    layout      uint8       PLANAR or INTERLEAVED
+    degree      uint64      number of edges
+    checksum    uint32      zlib.crc32 of the payload
+    reserved    12 bytes    zero
+
+In the PLANAR layout the payload is all the alpha values and then all
+the beta values. In the INTERLEAVED layout it is alpha, beta for each
+edge in turn, as yielded by iter_relabel.
+
+Loading maps the file into memory, and the permpair uses memoryviews
+of the map. Nothing is copied, and many processes can share the data.
+
+>>> import os, tempfile
+>>> from .work import A4
+>>> path = os.path.join(tempfile.mkdtemp(), 'A4.dessin')
+>>> save_permpair(path, A4)
+>>> A = load_permpair(path)
+>>> tuple(map(A.alpha, range(len(A))))
+(1, 2, 0, 5, 6, 3, 4)
+>>> read_header(path)
+{'version': 1, 'width': 1, 'layout': 0, 'degree': 7, 'checksum': 2975790549}
+
+>>> save_interleaved(path, A4.iter_relabel(6))
+>>> tuple(load_permpair(path).iter_relabel(0)) == tuple(A4.iter_relabel(6))
+True
+'''
+
+from array import array
+import itertools
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from .othertools import atomic_write
+from .work import ArrayPermPair
+
+MAGIC = b'DESN'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHBBQI12x')
+
+PLANAR = 0
+INTERLEAVED = 1
+
+TYPECODES = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+CHUNK_SIZE = 1 << 16            # Values written at a time.
+
+
+class FormatError(ValueError):
+    pass
+
+
+def width_for_degree(degree):
+    '''Return smallest width, in bytes, that holds edges of degree.
+
+    >>> width_for_degree(256), width_for_degree(257), width_for_degree(10**6)
+    (1, 2, 4)
+    '''
+
+    for width in sorted(TYPECODES):
+        if degree <= 1 << (8 * width):
+            return width
+
+    raise ValueError(degree)
+
+
+def save_permpair(path, permpair, width=None, layout=PLANAR):
+    '''Write permpair to path. Works for lazy permpairs too.
+
+    >>> from .work import A4
+    >>> save_permpair('A4.dessin', A4, width=3)
+    Traceback (most recent call last):
+    ValueError: Width must be one of 1, 2, 4 or 8, not 3
+    '''
+
+    degree = len(permpair)
+    if width is None:
+        width = width_for_degree(degree)
+    elif width not in TYPECODES:
+        raise ValueError('Width must be one of 1, 2, 4 or 8, not %s' % width)
+    elif width < width_for_degree(degree):
+        msg = 'Width %d is too small for degree %d, which needs %d'
+        raise ValueError(msg % (width, degree, width_for_degree(degree)))
+
+    edges = range(degree)
+    if layout == PLANAR:
+        if hasattr(permpair, 'alpha_array'):
+            # Copy each array in one step.
+            chunks = permpair.alpha_array, permpair.beta_array
+        else:
+            chunks = _iter_chunks(itertools.chain(
+                map(permpair.alpha, edges),
+                map(permpair.beta, edges),
+            ))
+    elif layout == INTERLEAVED:
+        chunks = _iter_chunks(_interleave(permpair.alpha, permpair.beta, edges))
+    else:
+        raise ValueError(layout)
+
+    _write(path, chunks, width, layout)
+
+
+def save_interleaved(path, ints, width=8):
+    '''Write interleaved alpha, beta values, such as from iter_relabel.
+
+    The values are streamed, so the width cannot be chosen to fit.
+    '''
+
+    _write(path, _iter_chunks(ints), width, INTERLEAVED)
+
+
+def read_header(path):
+    '''Return the header of path, as a dict.'''
+
+    with open(path, 'rb') as f:
+        return _unpack_header(f.read(HEADER.size))
+
+
+def load_permpair(path, verify=True):
+    '''Return ArrayPermPair, backed by memory map of path.
+
+    If verify, check the checksum. This reads every page of the file.
+    '''
+
+    with open(path, 'rb') as f:
+        # An empty file can't be mapped.
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise FormatError('Header too short')
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    header = _unpack_header(data[:HEADER.size])
+    degree = header['degree']
+    width = header['width']
+
+    payload = memoryview(data)[HEADER.size:]
+    if len(payload) != 2 * degree * width:
+        raise FormatError('Payload has wrong size')
+    if verify and zlib.crc32(payload) != header['checksum']:
+        raise FormatError('Checksum does not match')
+
+    if sys.byteorder == 'little':
+        values = payload.cast(TYPECODES[width])
+    else:
+        # Can't avoid a copy.
+        values = array(TYPECODES[width])
+        values.frombytes(payload)
+        values.byteswap()
+
+    if header['layout'] == PLANAR:
+        return ArrayPermPair(values[:degree], values[degree:])
+    else:
+        return ArrayPermPair(values[::2], values[1::2])
+
+
+def _unpack_header(data):
+
+    if len(data) != HEADER.size:
+        raise FormatError('Header too short')
+
+    magic, version, width, layout, degree, checksum = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise FormatError('Not a dessin file')
+    if version != FORMAT_VERSION:
+        raise FormatError('Unsupported version %s' % version)
+    if width not in TYPECODES or layout not in (PLANAR, INTERLEAVED):
+        raise FormatError('Bad width or layout')
+
+    return dict(
+        version=version,
+        width=width,
+        layout=layout,
+        degree=degree,
+        checksum=checksum,
+    )
+
+
+def _write(path, chunks, width, layout):
+
+    if width not in TYPECODES:
+        raise ValueError('Width must be one of 1, 2, 4 or 8, not %s' % width)
+
+    typecode = TYPECODES[width]
+    count = 0
+    checksum = 0
+
+    with atomic_write(path) as f:
+
+        # Placeholder header, as we don't yet know degree or checksum.
+        f.write(bytes(HEADER.size))
+
+        for chunk in chunks:
+            chunk = array(typecode, chunk)
+            if sys.byteorder != 'little':
+                chunk.byteswap()
+
+            data = chunk.tobytes()
+            f.write(data)
+            count += len(chunk)
+            checksum = zlib.crc32(data, checksum)
+
+        if count % 2:
+            raise ValueError('Odd number of values')
+
+        f.seek(0)
+        f.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, width, layout, count // 2, checksum))
+
+
+def _iter_chunks(ints):
+
+    ints = iter(ints)
+    while True:
+        chunk = list(itertools.islice(ints, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _interleave(alpha, beta, edges):
+
+    for edge in edges:
+        yield alpha(edge)
+        yield beta(edge)
@@ -0,0 +1,187 @@
+'''Cache of products and decompositions, keyed by canonical forms
+
+Isomorphic factors give isomorphic products, and the product does not
+depend on the order of the factors, up to isomorphism. So we key the
+cache by the sorted hashes of the canonical forms of the factors, and
+compute from the canonical factors in that order.
+
+>>> from .computations import AA_0, AB, A, B
+>>> cache = ProductCache()
+>>> [(len(d), count) for d, count in cache.decompose(AA_0, A)]
+[(42, 2), (210, 1)]
+>>> [(len(d), count) for d, count in cache.decompose(A, AA_0)]
+[(42, 2), (210, 1)]
+>>> cache.hits, cache.misses
+(1, 1)
+
+The cache holds at most max_edges edges. When full, the entries used
+least recently are dropped first.
+>>> cache = ProductCache(max_edges=100)
+>>> len(cache.product(A, B)), len(cache.product(A, A)), cache.edges
+(49, 49, 98)
+>>> _ = cache.product(B, B)
+>>> cache.stats()
+{'hits': 0, 'misses': 3, 'evictions': 1, 'entries': 2, 'dessins': 0, 'edges': 98}
+
+The dessins of decompositions are owned by the cache, and shared by
+its entries. Each is counted once, and is dropped with the last entry
+that uses it, so nothing outlives the bound on edges.
+>>> cache = ProductCache()
+>>> first = cache.decompose(AA_0, A)
+>>> second = cache.decompose(A, A)
+>>> [(len(d), count) for d, count in second]
+[(7, 1), (42, 1)]
+>>> first[0][0] is second[1][0]
+True
+>>> cache.stats()['dessins'], cache.edges
+(3, 259)
+'''
+
+import collections
+
+from .canonical import canonical_form
+from .codec import digest
+from .decompose import decompose_product
+from .work import ArrayPermPair
+from .work import ProductPermPair
+
+
+class ProductCache:
+    '''Least recently used cache of products and their decompositions.
+
+    The factors must be connected. The values returned are shared, so
+    must not be changed.
+    '''
+
+    def __init__(self, max_edges=1 << 24):
+
+        self.max_edges = max_edges
+        self.edges = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict() # key -> (value, edges, hashes)
+        self._dessins = {}      # hash -> [dessin, entries using it]
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def product(self, *factors):
+        '''Return ArrayPermPair isomorphic to the product of factors.
+
+        It is the product of the canonical factors, in sorted order.
+        '''
+
+        key, canonical = self._key('product', factors)
+        value = self._get(key)
+        if value is None:
+            value = ProductPermPair(canonical).materialize()
+            self._put(key, value, len(value), {})
+
+        return value
+
+
+    def decompose(self, *factors):
+        '''Return decomposition of the product of factors.
+
+        This is as decompose_product, but a dessin already held by the
+        cache is returned as the same object.
+        '''
+
+        key, canonical = self._key('decompose', factors)
+        value = self._get(key)
+        if value is None:
+            dessins = {}
+            value = []
+            for dessin, count in decompose_product(
+                    *canonical, interned={}, memo=False):
+                hash_ = digest(dessin)
+                if hash_ in self._dessins:
+                    dessin = self._dessins[hash_][0]
+                dessins[hash_] = dessin
+                value.append((dessin, count))
+            self._put(key, value, 0, dessins)
+
+        return value
+
+
+    def stats(self):
+        '''Return dict of hits, misses, evictions, entries, dessins and edges.'''
+
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            dessins=len(self._dessins),
+            edges=self.edges,
+        )
+
+
+    def clear(self):
+
+        self._entries.clear()
+        self._dessins.clear()
+        self.edges = 0
+
+
+    def _key(self, kind, factors):
+        '''Return key, and the canonical factors in key order.'''
+
+        items = []
+        for factor in factors:
+            canon = canonical_form(factor)[0]
+            if len(canon) != 2 * len(factor):
+                raise ValueError('Factors must be connected')
+            dessin = ArrayPermPair.from_iterable(canon)
+            items.append((digest(dessin), dessin))
+
+        items.sort(key=lambda item: item[0])
+        key = (kind,) + tuple(hash_ for hash_, dessin in items)
+        return key, [dessin for hash_, dessin in items]
+
+
+    def _get(self, key):
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+
+    def _put(self, key, value, edges, dessins):
+        '''Keep value, which has edges of its own, and uses dessins.
+
+        Here dessins is a dict of hash -> dessin. Those the cache
+        already holds are not counted again.
+        '''
+
+        if edges + sum(map(len, dessins.values())) > self.max_edges:
+            return              # Would evict everything, so don't keep.
+
+        self._entries[key] = value, edges, tuple(dessins)
+        self.edges += edges
+        for hash_, dessin in dessins.items():
+            held = self._dessins.get(hash_)
+            if held is None:
+                held = self._dessins[hash_] = [dessin, 0]
+                self.edges += len(dessin)
+            held[1] += 1
+
+        while self.edges > self.max_edges:
+            old_key, old_entry = self._entries.popitem(last=False)
+            old_value, old_edges, hashes = old_entry
+            self.edges -= old_edges
+            for hash_ in hashes:
+                held = self._dessins[hash_]
+                held[1] -= 1
+                if not held[1]:
+                    del self._dessins[hash_]
+                    self.edges -= len(held[0])
+            self.evictions += 1
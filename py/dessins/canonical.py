@@ -0,0 +1,356 @@
+'''Canonical forms of permutation pairs
+
+The canonical form of a permpair is the lexicographically smallest of
+its relabellings, as produced by iter_relabel. Rather than build every
+relabelling and sort them, we compare each root against the best so
+far, and drop it as soon as it falls behind.
+
+A root that ties with the best gives an isomorphism between their
+components. We record it, and skip every root it maps to a root we
+have already done. For highly symmetric permpairs, this skips almost
+every root.
+
+>>> from .work import A4, B4
+>>> canon, orbit = canonical_form(A4)
+>>> canon
+(1, 0, 0, 2, 3, 1, 4, 3, 2, 5, 6, 4, 5, 6)
+>>> orbit
+(6,)
+>>> canon == min(tuple(A4.iter_relabel(i)) for i in range(7))
+True
+'''
+
+from array import array
+
+from . import instrument
+from .components import explore_component
+
+
+def canonical_form(permpair, roots=None):
+    '''Return (canonical, orbit) for permpair.
+
+    Here canonical is the smallest relabelling of permpair, over all
+    roots (or the given roots), and orbit is a sorted tuple of the
+    roots that produce it. For a connected permpair, the orbit is an
+    orbit of the automorphism group, and its length is the order of
+    that group.
+
+    >>> from .work import ArrayPermPair
+    >>> cycle = ArrayPermPair([1, 2, 0], [1, 2, 0])
+    >>> canonical_form(cycle)
+    ((1, 1, 2, 2, 0, 0), (0, 1, 2))
+
+    When the components differ in size, a smaller component wins if
+    its relabelling is a prefix of the others.
+    >>> canonical_form(ArrayPermPair([0, 2, 1], [0, 2, 1]))
+    ((0, 0), (0,))
+
+    >>> canonical_form(ArrayPermPair([], []))
+    ((), ())
+    '''
+
+    with instrument.stage('canonical'):
+        return _canonical_form(permpair, roots, True)
+
+
+def canonical_orbit(permpair, roots=None, shared=None):
+    '''Return the orbit of canonical_form(permpair, roots).
+
+    This doesn't build the canonical relabelling, which for a large
+    permpair with few automorphisms is much of the cost.
+    >>> from .work import A4
+    >>> canonical_orbit(A4), canonical_orbit(A4, range(3))
+    ((6,), (0,))
+
+    Searches of the same permpair, over different roots, can share a
+    bound. Here shared is a writable sequence, holding one root. Each
+    new best root is written there, and a root written there by
+    another search is compared as if it were one of roots, though it
+    is in the orbit only if it is. A good bound, found early, saves
+    following roots that beat a poor best only to lose later. The
+    value is () if no root is as good as one from shared.
+    >>> shared = array('L', [6])
+    >>> canonical_orbit(A4, range(3), shared)
+    ()
+    >>> canonical_orbit(A4, range(6, 7), shared)
+    (6,)
+    '''
+
+    with instrument.stage('canonical'):
+        return _canonical_form(permpair, roots, False, shared)[1]
+
+
+def _canonical_form(permpair, roots, complete, shared=None):
+
+    alpha = permpair.alpha
+    beta = permpair.beta
+    length = len(permpair)
+    if roots is None:
+        roots = range(length)
+
+    # Roots known to have the same relabelling, as a union-find.
+    classes = _Classes(length)
+
+    # Workspaces, for the root being compared and for the best root,
+    # reset after use. Here length means unseen.
+    forward = array('L', [length]) * length
+    best_forward = array('L', [length]) * length
+
+    # The best relabelling is found only as far as comparisons need,
+    # and extended on demand. Most roots that beat the best so far
+    # are beaten in turn, long before their relabelling is complete.
+    best = None
+    best_root = None
+    best_backward = None
+    evaluations = 0             # Roughly, calls of alpha and beta.
+
+    def extend_best(size):
+        '''Extend best to size values, or until it is complete.'''
+
+        nonlocal evaluations
+        while len(best) < size:
+            index, odd = divmod(len(best), 2)
+            if index == len(best_backward):
+                break           # Complete.
+
+            old_label = best_backward[index]
+            old = beta(old_label) if odd else alpha(old_label)
+            new = best_forward[old]
+            if new == length:
+                new = best_forward[old] = len(best_backward)
+                best_backward.append(old)
+            best.append(new)
+            evaluations += 1
+
+    search = roots if shared is None else _with_shared(roots, shared, length)
+    for root in search:
+
+        if classes.is_done(root):
+            continue            # Same relabelling as a root done.
+        classes.set_done(root)
+
+        value = []
+        backward = [root]
+        forward[root] = 0
+        cmp = 0 if best is not None else -1
+
+        if cmp == 0:
+            for old_label in backward:
+
+                for old in alpha(old_label), beta(old_label):
+
+                    new = forward[old]
+                    if new == length:
+                        new = forward[old] = len(backward)
+                        backward.append(old)
+
+                    pos = len(value)
+                    if pos == len(best):
+                        extend_best(2 * pos + 16)
+                    if pos == len(best) or new > best[pos]:
+                        cmp = 1     # Worse than best.
+                        break
+
+                    value.append(new)
+                    if new < best[pos]:
+                        cmp = -1    # Better than best.
+                        break
+
+                if cmp:
+                    break
+
+            evaluations += len(value) + 1
+
+        if cmp == 0:
+            # All of this component agrees with best.
+            extend_best(len(value) + 1)
+            if len(value) < len(best):
+                cmp = -1        # Prefix of best, so better.
+
+        if cmp == -1:
+            # Keep the workspace of root, and reset that of the old best.
+            if best_backward is not None:
+                for old in best_backward:
+                    best_forward[old] = length
+            forward, best_forward = best_forward, forward
+            best = value
+            best_root = root
+            best_backward = backward
+            if shared is not None:
+                shared[0] = root
+            continue
+
+        if cmp == 0:
+            # A tie, which gives an isomorphism of components.
+            for old, new in zip(best_backward, backward):
+                classes.union(old, new)
+
+        # Reset the workspace, in time proportional to its use.
+        for old in backward:
+            forward[old] = length
+
+    if best is None:
+        instrument.count('alpha_beta', evaluations)
+        return (), ()
+
+    if complete:
+        extend_best(2 * length)
+    instrument.count('alpha_beta', evaluations)
+
+    orbit = sorted(root for root in roots if classes.same(root, best_root))
+    return tuple(best) if complete else None, tuple(orbit)
+
+
+def _with_shared(roots, shared, length):
+    '''Yield roots, and before each any new root found in shared.
+
+    A root from shared that is one of roots is left to its turn.
+    '''
+
+    inside = roots if isinstance(roots, range) else set(roots)
+    seen = None
+    for root in roots:
+        other = shared[0]
+        if other != seen:
+            seen = other
+            # Just in case of a torn read, check other is an edge.
+            if other < length and other not in inside:
+                yield other
+        yield root
+
+
+def automorphism(permpair, source, target):
+    '''Return automorphism taking edge source to target, or None.
+
+    An automorphism is a permutation of the edges that commutes with
+    alpha and beta. The permpair must be connected, and then there is
+    at most one automorphism taking source to target.
+
+    >>> from .work import ArrayPermPair
+    >>> cycle = ArrayPermPair([1, 2, 0], [1, 2, 0])
+    >>> automorphism(cycle, 0, 2)
+    array('L', [2, 0, 1])
+    >>> automorphism(ArrayPermPair([1, 0, 2], [0, 2, 1]), 0, 2) is None
+    True
+    '''
+
+    length = len(permpair)
+    source_pair, source_edges = explore_component(permpair, source)
+    if len(source_edges) != length:
+        raise ValueError('Permpair is not connected')
+
+    target_pair, target_edges = explore_component(permpair, target)
+    if (source_pair.alpha_array != target_pair.alpha_array
+        or source_pair.beta_array != target_pair.beta_array):
+        return None
+
+    value = array('L', [0]) * length
+    for old, new in zip(source_edges, target_edges):
+        value[old] = new
+
+    return value
+
+
+def automorphisms(permpair):
+    '''Yield every automorphism of connected permpair.
+
+    The automorphisms are in bijection with the orbit returned by
+    canonical_form. The first one yielded is the identity.
+
+    >>> from .work import A4, ArrayPermPair
+    >>> len(list(automorphisms(A4)))
+    1
+    >>> list(automorphisms(ArrayPermPair([1, 0], [1, 0])))
+    [array('L', [0, 1]), array('L', [1, 0])]
+    '''
+
+    canon, orbit = canonical_form(permpair)
+    for target in orbit:
+        yield automorphism(permpair, orbit[0], target)
+
+
+def automorphism_generators(permpair):
+    '''Return list of automorphisms, that generate the whole group.
+
+    Each new generator at least doubles the group generated so far,
+    so there are at most log2 of the group order of them.
+
+    >>> from .computations import AAAAA_0
+    >>> len(automorphism_generators(AAAAA_0)) <= 11  # 2**11 > 2520
+    True
+    '''
+
+    canon, orbit = canonical_form(permpair)
+    root = orbit[0]
+    generators = []
+    reached = {root}
+    for target in orbit:
+        if target not in reached:
+            generators.append(automorphism(permpair, root, target))
+            reached = _orbit_of(root, generators)
+
+    return generators
+
+
+def _orbit_of(point, generators):
+    '''Return the set of images of point, under the group generated.'''
+
+    orbit = {point}
+    todo = [point]
+    while todo:
+        point = todo.pop()
+        for generator in generators:
+            image = generator[point]
+            if image not in orbit:
+                orbit.add(image)
+                todo.append(image)
+
+    return orbit
+
+
+class _Classes:
+    '''Union-find on range(size), with a done flag for each class.
+
+    >>> classes = _Classes(4)
+    >>> classes.union(0, 2); classes.set_done(2)
+    >>> classes.same(0, 2), classes.same(0, 1), classes.is_done(0)
+    (True, False, True)
+    '''
+
+    __slots__ = '_parent', '_done'
+
+    def __init__(self, size):
+
+        self._parent = array('L', range(size))
+        self._done = bytearray(size)
+
+
+    def find(self, i):
+
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]] # Path halving.
+            i = parent[i]
+        return i
+
+
+    def union(self, i, j):
+
+        i = self.find(i)
+        j = self.find(j)
+        if i != j:
+            i, j = min(i, j), max(i, j)
+            self._parent[j] = i
+            self._done[i] |= self._done[j]
+
+
+    def same(self, i, j):
+        return self.find(i) == self.find(j)
+
+
+    def is_done(self, i):
+        return bool(self._done[self.find(i)])
+
+
+    def set_done(self, i):
+        self._done[self.find(i)] = True
@@ -0,0 +1,272 @@
+'''Catalogue of canonical dessins, stored in SQLite
+
+Each connected dessin is stored once, in canonical form, with its
+fingerprint and a hash of its canonical form. We also record where
+dessins came from, namely the decomposition of a named source such as
+a product. So a long job can skip sources it has already done, and
+find known dessins without recomputing them.
+
+>>> from .computations import AAAA_0, A
+>>> catalogue = Catalogue()
+>>> [(len(d), count) for d, count in catalogue.decompose('AAAA_0*A', AAAA_0 * A)]
+[(840, 4), (2520, 1)]
+>>> len(catalogue)
+2
+
+Once recorded, the decomposition is read back, not recomputed.
+>>> [(len(d), count) for d, count in catalogue.decompose('AAAA_0*A', None)]
+[(840, 4), (2520, 1)]
+>>> catalogue.decomposition('AAAAA_0*A') is None
+True
+'''
+
+import sqlite3
+
+from .canonical import canonical_form
+from .codec import decode_permpair
+from .codec import digest
+from .codec import encode_permpair
+from .decompose import decompose
+from .invariants import fingerprint
+from .work import ArrayPermPair
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS dessins (
+    id          INTEGER PRIMARY KEY,
+    hash        TEXT NOT NULL UNIQUE,
+    fingerprint TEXT NOT NULL,
+    degree      INTEGER NOT NULL,
+    genus       INTEGER NOT NULL,
+    canonical   BLOB NOT NULL,
+    name        TEXT
+);
+CREATE INDEX IF NOT EXISTS dessins_fingerprint ON dessins (fingerprint);
+CREATE TABLE IF NOT EXISTS sources (
+    source      TEXT NOT NULL,
+    dessin      INTEGER NOT NULL REFERENCES dessins (id),
+    count       INTEGER NOT NULL,
+    PRIMARY KEY (source, dessin)
+);
+'''
+
+
+class Catalogue:
+    '''Dessins in an SQLite database at path, by default in memory.
+
+    >>> from .computations import A, B
+    >>> from .work import A4
+    >>> catalogue = Catalogue()
+    >>> catalogue.add(A, name='A')
+    1
+    >>> catalogue.add_many([B, A4])
+    [2, 1]
+    >>> catalogue.lookup(A4), catalogue.info(1)['name']
+    (1, 'A')
+
+    A dessin already there keeps its name, or is given one if it has
+    none.
+    >>> catalogue.add(B, name='B'), catalogue.add(A4, name='A4')
+    (2, 1)
+    >>> catalogue.info(2)['name'], catalogue.info(1)['name']
+    ('B', 'A')
+
+    The fingerprint rejects most strangers without a canonical form.
+    >>> from .computations import AB_0
+    >>> catalogue.lookup(AB_0) is None
+    True
+    '''
+
+    def __init__(self, path=':memory:'):
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+
+    def close(self):
+
+        self.connection.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def __len__(self):
+
+        cursor = self.connection.execute('SELECT COUNT(*) FROM dessins')
+        return cursor.fetchone()[0]
+
+
+    def add(self, permpair, name=None):
+        '''Add connected permpair, unless already there. Return its id.
+
+        A disconnected permpair raises ValueError, as its canonical form
+        is that of its smallest component only.
+        >>> from .work import ArrayPermPair
+        >>> Catalogue().add(ArrayPermPair([1, 0, 2], [1, 0, 2]))
+        Traceback (most recent call last):
+        ValueError: Permpair must be connected
+        '''
+
+        with self.connection:
+            return self._add(permpair, name)
+
+
+    def add_many(self, permpairs):
+        '''Add connected permpairs in one transaction. Return their ids.'''
+
+        with self.connection:
+            return [self._add(permpair, None) for permpair in permpairs]
+
+
+    def lookup(self, permpair):
+        '''Return id of dessin isomorphic to permpair, or None.'''
+
+        rows = self.find(fingerprint(permpair))
+        if not rows:
+            return None         # The fast rejection.
+
+        return self.lookup_hash(_canonical_hash(permpair))
+
+
+    def lookup_hash(self, key):
+        '''Return id of dessin whose canonical form has hash key, or None.'''
+
+        cursor = self.connection.execute(
+            'SELECT id FROM dessins WHERE hash = ?', (key,))
+        row = cursor.fetchone()
+        return row and row[0]
+
+
+    def find(self, fprint):
+        '''Return ids of dessins with fingerprint fprint.
+
+        >>> from .computations import A
+        >>> catalogue = Catalogue()
+        >>> catalogue.find(fingerprint(A))
+        []
+        >>> catalogue.add(A)
+        1
+        >>> catalogue.find(fingerprint(A))
+        [1]
+        '''
+
+        cursor = self.connection.execute(
+            'SELECT id FROM dessins WHERE fingerprint = ? ORDER BY id',
+            (repr(fprint),))
+        return [row[0] for row in cursor]
+
+
+    def dessin(self, dessin_id):
+        '''Return the dessin with id, as a canonical ArrayPermPair.'''
+
+        cursor = self.connection.execute(
+            'SELECT canonical FROM dessins WHERE id = ?', (dessin_id,))
+        row = cursor.fetchone()
+        if row is None:
+            raise KeyError(dessin_id)
+
+        return decode_permpair(row[0])
+
+
+    def info(self, dessin_id):
+        '''Return dict of the stored data for id, except the dessin.'''
+
+        cursor = self.connection.execute(
+            'SELECT hash, fingerprint, degree, genus, name '
+            'FROM dessins WHERE id = ?', (dessin_id,))
+        row = cursor.fetchone()
+        if row is None:
+            raise KeyError(dessin_id)
+
+        return dict(zip(('hash', 'fingerprint', 'degree', 'genus', 'name'), row))
+
+
+    def record(self, source, decomposition):
+        '''Record decomposition, a list of (dessin, count), of source.
+
+        Each dessin must be in canonical form, as from decompose.
+        '''
+
+        with self.connection:
+            for dessin, count in decomposition:
+                dessin_id = self._add_canonical(dessin, None)
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO sources VALUES (?, ?, ?)',
+                    (source, dessin_id, count))
+
+
+    def decomposition(self, source):
+        '''Return recorded decomposition of source, or None.
+
+        As with decompose, the list is sorted by degree and canonical
+        form.
+        '''
+
+        cursor = self.connection.execute(
+            'SELECT dessin, count FROM sources WHERE source = ?', (source,))
+        rows = cursor.fetchall()
+        if not rows:
+            return None
+
+        value = []
+        for dessin_id, count in rows:
+            dessin = self.dessin(dessin_id)
+            value.append((dessin, count))
+
+        value.sort(key=lambda item: (
+            len(item[0]), tuple(item[0].iter_relabel(0))))
+        return value
+
+
+    def decompose(self, source, permpair):
+        '''Return decomposition of source, computing permpair if need be.'''
+
+        value = self.decomposition(source)
+        if value is None:
+            value = decompose(permpair)
+            self.record(source, value)
+
+        return value
+
+
+    def _add(self, permpair, name):
+
+        canon = canonical_form(permpair)[0]
+        if len(canon) != 2 * len(permpair):
+            raise ValueError('Permpair must be connected')
+
+        return self._add_canonical(ArrayPermPair.from_iterable(canon), name)
+
+
+    def _add_canonical(self, dessin, name):
+        '''Add dessin, or name it if already there without a name.'''
+
+        key = digest(dessin)
+
+        dessin_id = self.lookup_hash(key)
+        if dessin_id is None:
+            fprint = fingerprint(dessin)
+            cursor = self.connection.execute(
+                'INSERT INTO dessins '
+                '(hash, fingerprint, degree, genus, canonical, name) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, repr(fprint), fprint[0], fprint[2],
+                 encode_permpair(dessin, compress=True), name))
+            dessin_id = cursor.lastrowid
+        elif name is not None:
+            self.connection.execute(
+                'UPDATE dessins SET name = ? WHERE id = ? AND name IS NULL',
+                (name, dessin_id))
+
+        return dessin_id
+
+
+def _canonical_hash(permpair):
+
+    canon = canonical_form(permpair)[0]
+    return digest(ArrayPermPair.from_iterable(canon))
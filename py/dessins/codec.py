@@ -0,0 +1,398 @@
+'''Compact streaming codec for permutation pairs
+
+The base 62 strings of othertools hold only values below 62. Here each
+value is a variable length integer (LEB128): seven bits in each byte,
+with the high bit set on all but the last byte. So small values take
+one byte, and there is no upper limit.
+
+The values are interleaved alpha, beta, as yielded by iter_relabel.
+With DELTA, each value is first stored as its difference from its
+edge, zigzagged so that small negative differences are small too. In a
+relabelled permpair the values are close to their edges, and most take
+one or two bytes. With ZLIB, the bytes are then compressed.
+
+    magic       2 bytes     b'DV'
+    version     uint8       FORMAT_VERSION
+    flags       uint8       DELTA | ZLIB
+    payload                 the varints, compressed if ZLIB
+
+There is no length, so a stream can be written before its length is
+known. Encoding and decoding work a chunk at a time, and so does the
+text variant, which is the url-safe base 64 of the bytes.
+
+>>> from .work import A4
+>>> data = encode_permpair(A4)
+>>> data
+b'DV\\x01\\x01\\x02\\x00\\x02\\x04\\x03\\x04\\x04\\x03\\x04\\x03\\x03\\x00\\x03\\x00'
+>>> A5 = decode_permpair(data)
+>>> tuple(A5.iter_relabel(3)) == tuple(A4.iter_relabel(3))
+True
+
+The text variant is safe for logs, JSON and URLs.
+>>> encode_permpair(A4, text=True)
+'RFYBAQIAAgQDBAQDBAMDAAMA'
+>>> decode_permpair('RFYBAQIAAgQDBAQDBAMDAAMA').alpha_array
+array('L', [1, 2, 0, 5, 6, 3, 4])
+'''
+
+from array import array
+import base64
+import hashlib
+import itertools
+import zlib
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .work import ArrayPermPair
+
+MAGIC = b'DV'
+FORMAT_VERSION = 1
+DELTA = 1
+ZLIB = 2
+
+CHUNK_SIZE = 1 << 16            # Values, or bytes, at a time.
+
+
+class FormatError(ValueError):
+    pass
+
+
+def iter_encode(ints, delta=True, compress=False, text=False):
+    '''Yield encoding of interleaved alpha, beta values, in chunks.
+
+    The chunks are bytes, or if text then str.
+    >>> b''.join(iter_encode([0, 1, 300], delta=False))
+    b'DV\\x01\\x00\\x00\\x01\\xac\\x02'
+    '''
+
+    chunks = _iter_chunks(ints)
+    data = _iter_encode_chunks(chunks, delta, compress)
+    if text:
+        data = _iter_b64encode(data)
+
+    return data
+
+
+def iter_decode(chunks):
+    '''Yield the values encoded by chunks, which are bytes or str.
+
+    >>> list(iter_decode([b'DV\\x01\\x00\\x00\\x01', b'\\xac', b'\\x02']))
+    [0, 1, 300]
+    '''
+
+    for values in _iter_decode_arrays(chunks):
+        yield from values
+
+
+def encode_permpair(permpair, delta=True, compress=False, text=False):
+    '''Return encoding of permpair, as bytes or if text then str.'''
+
+    chunks = _iter_permpair_chunks(permpair)
+    data = _iter_encode_chunks(chunks, delta, compress)
+    if text:
+        return ''.join(_iter_b64encode(data))
+    else:
+        return b''.join(data)
+
+
+def decode_permpair(data):
+    '''Return ArrayPermPair, from bytes, str, or iterable of chunks.
+
+    >>> from .work import A4
+    >>> data = encode_permpair(A4, compress=True)
+    >>> chunks = [data[i:i+3] for i in range(0, len(data), 3)]
+    >>> decode_permpair(chunks).beta_array
+    array('L', [0, 3, 4, 1, 2, 5, 6])
+    '''
+
+    if isinstance(data, (bytes, bytearray, memoryview, str)):
+        data = [data]
+
+    # Values at even positions in the stream are alpha.
+    alpha_array = array('L')
+    beta_array = array('L')
+    count = 0
+    for values in _iter_decode_arrays(data):
+        odd = count % 2
+        alpha_array.extend(values[odd::2])
+        beta_array.extend(values[1 - odd::2])
+        count += len(values)
+
+    if count % 2:
+        raise FormatError('Odd number of values')
+
+    return ArrayPermPair(alpha_array, beta_array)
+
+
+def write_permpair(f, permpair, delta=True, compress=False, text=False):
+    '''Write encoding of permpair to file object f, a chunk at a time.'''
+
+    chunks = _iter_permpair_chunks(permpair)
+    data = _iter_encode_chunks(chunks, delta, compress)
+    if text:
+        data = _iter_b64encode(data)
+
+    for chunk in data:
+        f.write(chunk)
+
+
+def read_permpair(f):
+    '''Return ArrayPermPair, read from file object f.
+
+    >>> import io
+    >>> from .work import A4
+    >>> f = io.StringIO()
+    >>> write_permpair(f, A4, text=True, compress=True)
+    >>> A5 = read_permpair(io.StringIO(f.getvalue()))
+    >>> tuple(A5.iter_relabel(0)) == tuple(A4.iter_relabel(0))
+    True
+    '''
+
+    first = f.read(CHUNK_SIZE)
+    if not first:
+        raise FormatError('Empty file')
+
+    # The sentinel must have the same type as the file's data.
+    chunks = iter(lambda: f.read(CHUNK_SIZE), first[:0])
+    return decode_permpair(itertools.chain([first], chunks))
+
+
+def digest(permpair):
+    '''Return sha256 hex digest of the encoding of permpair.
+
+    The digest doesn't depend on how permpair is stored, but does
+    depend on its labels. For a key of the dessin, apply it to the
+    canonical form.
+    >>> from .work import A4
+    >>> digest(A4) == digest(A4.materialize())
+    True
+    '''
+
+    sha = hashlib.sha256()
+    chunks = _iter_permpair_chunks(permpair)
+    for data in _iter_encode_chunks(chunks, True, False):
+        sha.update(data)
+
+    return sha.hexdigest()
+
+
+def _iter_chunks(ints):
+
+    ints = iter(ints)
+    while True:
+        chunk = array('L', itertools.islice(ints, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_permpair_chunks(permpair):
+
+    length = len(permpair)
+    step = CHUNK_SIZE // 2
+
+    if hasattr(permpair, 'alpha_array'):
+        # Interleave the arrays by slice assignment.
+        alpha_array = permpair.alpha_array
+        beta_array = permpair.beta_array
+        for start in range(0, length, step):
+            stop = min(start + step, length)
+            chunk = array('L', [0]) * (2 * (stop - start))
+            chunk[::2] = array('L', alpha_array[start:stop])
+            chunk[1::2] = array('L', beta_array[start:stop])
+            yield chunk
+    else:
+        alpha, beta = permpair.alpha, permpair.beta
+        for start in range(0, length, step):
+            edges = range(start, min(start + step, length))
+            yield array('L', itertools.chain.from_iterable(
+                (alpha(edge), beta(edge)) for edge in edges))
+
+
+def _iter_encode_chunks(chunks, delta, compress):
+
+    flags = (DELTA if delta else 0) | (ZLIB if compress else 0)
+    yield MAGIC + bytes([FORMAT_VERSION, flags])
+
+    encode = _encode_numpy if numpy is not None else _encode_python
+    compressor = zlib.compressobj() if compress else None
+    count = 0
+    for chunk in chunks:
+        data = encode(chunk, count, delta)
+        count += len(chunk)
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            yield data
+
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def _iter_decode_arrays(chunks):
+
+    chunks = iter(chunks)
+    first = next(chunks, b'')
+    if isinstance(first, str):
+        chunks = _iter_b64decode(itertools.chain([first], chunks))
+    else:
+        chunks = itertools.chain([first], chunks)
+
+    # Read the header, which may be split across chunks.
+    head = b''
+    for chunk in chunks:
+        head += bytes(chunk)
+        if len(head) >= 4:
+            break
+    if len(head) < 4 or head[:2] != MAGIC:
+        raise FormatError('Not a dessin stream')
+    version, flags = head[2], head[3]
+    if version != FORMAT_VERSION:
+        raise FormatError('Unsupported version %s' % version)
+    if flags & ~(DELTA | ZLIB):
+        raise FormatError('Unknown flags %s' % flags)
+
+    delta = bool(flags & DELTA)
+    decompressor = zlib.decompressobj() if flags & ZLIB else None
+    decode = _decode_numpy if numpy is not None else _decode_python
+
+    count = 0
+    tail = b''                  # Incomplete varint, from last chunk.
+    for data in itertools.chain([head[4:]], chunks):
+
+        data = bytes(data)
+        if decompressor is not None:
+            data = decompressor.decompress(data)
+
+        values, tail = decode(tail + data, count, delta)
+        count += len(values)
+        if values:
+            yield values
+
+    if decompressor is not None and not decompressor.eof:
+        raise FormatError('Truncated stream')
+    if tail:
+        raise FormatError('Truncated varint')
+
+
+def _encode_python(values, start, delta):
+
+    out = bytearray()
+    for index, value in enumerate(values, start):
+        if delta:
+            value -= index >> 1             # The edge.
+            value = 2 * value if value >= 0 else -2 * value - 1
+        while value >= 0x80:
+            out.append(value & 0x7f | 0x80)
+            value >>= 7
+        out.append(value)
+
+    return bytes(out)
+
+
+def _decode_python(data, start, delta):
+    '''Return array of complete varints in data, and remaining bytes.'''
+
+    values = array('L')
+    value = shift = 0
+    used = 0
+    for i, byte in enumerate(data):
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if byte < 0x80:
+            if delta:
+                value = (value >> 1) ^ -(value & 1)
+                value += (start + len(values)) >> 1
+            values.append(value)
+            value = shift = 0
+            used = i + 1
+
+    return values, data[used:]
+
+
+def _encode_numpy(values, start, delta):
+
+    values = numpy.asarray(values, dtype=numpy.int64)
+    if delta:
+        diffs = values - (numpy.arange(start, start + len(values)) >> 1)
+        values = (diffs << 1) ^ (diffs >> 63)
+    values = values.astype(numpy.uint64)
+
+    # Number of bytes for each value.
+    sizes = numpy.ones(len(values), dtype=numpy.int64)
+    rest = values >> numpy.uint64(7)
+    while rest.any():
+        sizes += rest != 0
+        rest >>= numpy.uint64(7)
+
+    ends = numpy.cumsum(sizes)
+    starts = ends - sizes
+    out = numpy.empty(int(ends[-1]) if len(ends) else 0, dtype=numpy.uint8)
+    for k in range(int(sizes.max()) if len(sizes) else 0):
+        select = sizes > k
+        byte = (values[select] >> numpy.uint64(7 * k)) & numpy.uint64(0x7f)
+        byte |= numpy.where(sizes[select] > k + 1, 0x80, 0).astype(numpy.uint64)
+        out[starts[select] + k] = byte
+
+    return out.tobytes()
+
+
+def _decode_numpy(data, start, delta):
+
+    data = numpy.frombuffer(data, dtype=numpy.uint8)
+    ends = numpy.flatnonzero(data < 0x80)
+    if not len(ends):
+        return array('L'), data.tobytes()
+
+    used = int(ends[-1]) + 1
+    starts = numpy.concatenate(([0], ends[:-1] + 1))
+    sizes = ends + 1 - starts
+    shifts = numpy.arange(used) - numpy.repeat(starts, sizes)
+    parts = (data[:used] & 0x7f).astype(numpy.uint64)
+    parts <<= (7 * shifts).astype(numpy.uint64)
+    values = numpy.bitwise_or.reduceat(parts, starts)
+
+    if delta:
+        halves = (values >> numpy.uint64(1)).astype(numpy.int64)
+        signs = (values & numpy.uint64(1)).astype(numpy.int64)
+        values = halves ^ -signs
+        values += numpy.arange(start, start + len(values)) >> 1
+
+    out = array('L')
+    out.frombytes(values.astype(numpy.uint64).tobytes())
+    return out, data[used:].tobytes()
+
+
+def _iter_b64encode(chunks):
+
+    # Base 64 maps 3 bytes to 4 characters, so carry the remainder.
+    rest = b''
+    for chunk in chunks:
+        data = rest + chunk
+        cut = len(data) - len(data) % 3
+        rest = data[cut:]
+        if cut:
+            yield base64.urlsafe_b64encode(data[:cut]).decode('ascii')
+
+    if rest:
+        yield base64.urlsafe_b64encode(rest).decode('ascii')
+
+
+def _iter_b64decode(chunks):
+
+    rest = ''
+    for chunk in chunks:
+        text = rest + ''.join(chunk.split())
+        cut = len(text) - len(text) % 4
+        rest = text[cut:]
+        if cut:
+            try:
+                yield base64.urlsafe_b64decode(text[:cut])
+            except ValueError:
+                raise FormatError('Bad base 64')
+
+    if rest:
+        raise FormatError('Truncated base 64')
@@ -0,0 +1,224 @@
+'''Connected components of permutation pairs
+
+Two edges are in the same component if one can be reached from the
+other by applying alpha and beta. We label every edge with its
+component in a single pass, rather than doing a search from every
+root.
+
+Components are numbered in order of their lowest edge.
+>>> from .work import A4, B4
+>>> labels, sizes = components(A4 * A4)
+>>> sizes
+array('L', [7, 42])
+>>> tuple(labels[:10])
+(0, 1, 1, 1, 1, 1, 1, 1, 0, 1)
+>>> component_roots(labels, len(sizes))
+array('L', [0, 1])
+
+Lazy and materialized permpairs give the same result.
+>>> components(A4.materialize() * B4.materialize()) == components(A4 * B4)
+True
+'''
+
+from array import array
+
+from . import instrument
+from .permtools import Relabel
+from .work import ArrayPermPair
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def components(permpair):
+    '''Return (labels, sizes) for the components of permpair.
+
+    Here labels[edge] is the component number of edge, and sizes[i]
+    is the number of edges in component i. Both are array('L').
+
+    >>> from .work import ArrayPermPair
+    >>> labels, sizes = components(ArrayPermPair([1, 0, 2, 3], [0, 1, 3, 2]))
+    >>> labels, sizes
+    (array('L', [0, 0, 1, 1]), array('L', [2, 2]))
+    '''
+
+    alpha_array = getattr(permpair, 'alpha_array', None)
+    beta_array = getattr(permpair, 'beta_array', None)
+    with instrument.stage('components'):
+        if numpy is not None and alpha_array is not None:
+            return _components_numpy(alpha_array, beta_array)
+        else:
+            return _components_python(permpair.alpha, permpair.beta, len(permpair))
+
+
+def component_roots(labels, count):
+    '''Return array whose i-th item is the lowest edge in component i.
+
+    >>> component_roots([0, 1, 0, 2, 1], 3)
+    array('L', [0, 1, 3])
+    '''
+
+    roots = array('L', bytes(count * array('L').itemsize))
+    found = 0
+    for edge, label in enumerate(labels):
+        # Labels first appear in increasing order.
+        if label == found:
+            roots[label] = edge
+            found += 1
+            if found == count:
+                break
+
+    return roots
+
+
+def iter_component_permpairs(permpair):
+    '''Yield each component of permpair, as an ArrayPermPair.
+
+    Each component is relabelled from its lowest edge, in order.
+    >>> from .work import A4
+    >>> [len(p) for p in iter_component_permpairs(A4 * A4)]
+    [7, 42]
+    '''
+
+    labels, sizes = components(permpair)
+    roots = component_roots(labels, len(sizes))
+
+    # Reuse one workspace for all the components.
+    relabel = Relabel(len(permpair))
+    out = array('L', [0]) * (2 * max(sizes, default=0))
+    for root in roots:
+        with instrument.stage('relabel'):
+            count = permpair.relabel_into(root, out, relabel)
+            component = ArrayPermPair(out[:count:2], out[1:count:2])
+        yield component
+
+
+def explore_component(permpair, root):
+    '''Return (component, edges) for the component of root.
+
+    Here component is the ArrayPermPair given by relabelling from
+    root, and edges is the list whose i-th item is the edge of
+    permpair with new label i. Only the component is visited, and
+    the relabelling table is a dict, so memory is proportional to
+    the size of the component, not of permpair. Use this for huge
+    lazy products.
+
+    >>> from .work import A4, power
+    >>> product = power(A4, 12)
+    >>> len(product)
+    13841287201
+    >>> component, edges = explore_component(product, 0)
+    >>> len(component), edges[:3]
+    (7, [0, 2306881200, 4613762400])
+    >>> tuple(component.iter_relabel(0)) == tuple(A4.iter_relabel(0))
+    True
+    '''
+
+    alpha = permpair.alpha
+    beta = permpair.beta
+    forward = {root: 0}
+    edges = [root]
+    values = array('L')
+
+    for old_label in edges:     # Grows as we go.
+        for old in alpha(old_label), beta(old_label):
+            new = forward.get(old)
+            if new is None:
+                new = forward[old] = len(edges)
+                edges.append(old)
+            values.append(new)
+
+    return ArrayPermPair(values[::2], values[1::2]), edges
+
+
+def _components_python(alpha, beta, length):
+    '''Flood fill from each unlabelled edge, lowest first.
+
+    Works with any alpha and beta callables, including lazy products.
+    '''
+
+    unseen = length             # Sentinel for an unlabelled edge.
+    labels = array('L', [unseen]) * length
+    sizes = array('L')
+
+    for root in range(length):
+
+        if labels[root] != unseen:
+            continue
+
+        label = len(sizes)
+        labels[root] = label
+        stack = [root]
+        size = 0
+        while stack:
+            edge = stack.pop()
+            size += 1
+            for other in alpha(edge), beta(edge):
+                if labels[other] == unseen:
+                    labels[other] = label
+                    stack.append(other)
+
+        sizes.append(size)
+
+    return labels, sizes
+
+
+def _components_numpy(alpha_array, beta_array):
+    '''Hook each edge onto the lowest root, then shortcut, until done.
+
+    This is min-label hooking with pointer jumping. Each round is a
+    few vectorized passes, and each hook reduces the number of roots.
+    '''
+
+    alphas = _as_ndarray(alpha_array)
+    betas = _as_ndarray(beta_array)
+    if len(alphas) != len(betas):
+        raise ValueError
+
+    length = len(alphas)
+    parent = numpy.arange(length, dtype='L')
+    changed = True
+    while changed:
+
+        changed = False
+        for perm in alphas, betas:
+
+            # Every parent is now a root. Hook the higher root onto
+            # the lower. If several land on one root, any will do.
+            mine = parent
+            theirs = parent[perm]
+            differ = mine != theirs
+            if not differ.any():
+                continue
+
+            changed = True
+            mine = mine[differ]
+            theirs = theirs[differ]
+            parent[numpy.maximum(mine, theirs)] = numpy.minimum(mine, theirs)
+
+            # Pointer jumping, until every edge points at its root.
+            while True:
+                grand = parent[parent]
+                if numpy.array_equal(grand, parent):
+                    break
+                parent = grand
+
+    # Now parent[edge] is the lowest edge in its component.
+    is_root = parent == numpy.arange(length, dtype='L')
+    inverse = (numpy.cumsum(is_root) - 1)[parent]
+    labels = array('L')
+    labels.frombytes(inverse.astype('L').tobytes())
+    sizes = array('L')
+    counts = numpy.bincount(inverse, minlength=int(is_root.sum()))
+    sizes.frombytes(counts.astype('L').tobytes())
+    return labels, sizes
+
+
+def _as_ndarray(seq):
+
+    if isinstance(seq, (array, memoryview)):
+        return numpy.asarray(seq).astype('L', copy=False)
+    else:
+        return numpy.fromiter(seq, dtype='L', count=len(seq))
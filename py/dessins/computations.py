@@ -1,4 +1,9 @@
-'''Let's look at relabelling.
+'''The constants in this module are computed on first use.
+>>> from .computations import A, B, AA, AB, BB, AA_0, BB_0, AB_0
+>>> from .computations import AAA_0, AAAA_0, AAAAA_0
+>>> from .computations import BBB_0, BBBB_0, BBBBB_0, AAB_0
+
+Let's look at relabelling.
 >>> for t in sorted(every_relabel_of(A_orig)): print(t)
 ((1, 0, 0, 2, 3, 1, 4, 3, 2, 5, 6, 4, 5, 6), 6)
 ((1, 0, 0, 2, 3, 1, 4, 5, 2, 4, 6, 3, 5, 6), 5)
@@ -95,6 +100,12 @@ non-trivial one.
 210 73 (1, 0, 2, 3, 4, 5, 6, 1, 7, 8)
 210 197 (1, 0, 2, 3, 4, 5, 6, 1, 7, 8)
 
+The canonical form gives the best relabelling, and all the roots
+that produce it, without sorting every relabelling.
+>>> canon, orbit = canonical_form(TMP2)
+>>> canon == tmp2[0][0], len(orbit), orbit[:5]
+(True, 6, (16, 47, 55, 73, 197))
+
 Now use the information we've obtained. First, we need to find the
 relabelling index. Hint: It's not 16.
 >>> for t, i in every_relabel_of(TMP):
@@ -139,6 +150,10 @@ the rest.
 >>> [len(tuple(TMP.iter_relabel(i)))//2 for i in range(7)]
 [840, 840, 2520, 2520, 2520, 840, 840]
 
+We can get the same information in a single pass.
+>>> components(TMP)[1]
+array('L', [840, 840, 2520, 840, 840])
+
 At this point, we won't bother finding the best.
 >>> t = tuple(AAAAA_0.iter_relabel(0)); (len(t)//2, t[:20])
 (2520, (1, 2, 3, 4, 5, 0, 6, 7, 8, 1, 9, 10, 11, 12, 13, 3, 14, 15, 16, 17))
@@ -212,26 +227,82 @@ Note that 294 = 42 * 7.
 >>> aaa == bbb
 True
 
+The same, using canonical forms.
+>>> canonical_form(AAB_0)[0] == canonical_form(AA_0 * B)[0] == aaa
+True
+
+
+Finally, let decompose find the components and their multiplicities.
+The dessins it returns are canonical, so we can name them.
+>>> names = dict((canonical_form(value)[0], name) for name, value in [
+...     ('A', A), ('B', B), ('AA_0', AA_0), ('BB_0', BB_0),
+...     ('AB_0', AB_0), ('AAA_0', AAA_0), ('AAAA_0', AAAA_0),
+...     ('AAAAA_0', AAAAA_0), ('BBB_0', BBB_0), ('BBBB_0', BBBB_0),
+...     ('BBBBB_0', BBBBB_0), ('AAB_0', AAB_0),
+... ])
+>>> def show(permpair):
+...     return ' + '.join(
+...         '%s*%s' % (count, names[tuple(dessin.iter_relabel(0))])
+...         for dessin, count in decompose(permpair)
+...     )
+
+>>> show(AA); show(BB); show(AB)
+'1*A + 1*AA_0'
+'1*B + 1*BB_0'
+'1*AB_0'
+
+>>> show(AA_0 * A); show(AAA_0 * A); show(AAAA_0 * A); show(AAAAA_0 * A)
+'2*AA_0 + 1*AAA_0'
+'3*AAA_0 + 1*AAAA_0'
+'4*AAAA_0 + 1*AAAAA_0'
+'7*AAAAA_0'
+
+>>> show(BB_0 * B); show(BBB_0 * B); show(BBBB_0 * B); show(BBBBB_0 * B)
+'2*BB_0 + 1*BBB_0'
+'3*BBB_0 + 1*BBBB_0'
+'4*BBBB_0 + 1*BBBBB_0'
+'7*BBBBB_0'
+
+>>> show(AB * A); show(AA_0 * B)
+'1*AB_0 + 1*AAB_0'
+'1*AAB_0'
+
 '''
 
 from .work import A4 as A_orig
 from .work import B4 as B_orig
 
-from .work import PermPair
-from .work import aaa_from_bytes
-from .work import bytes_from_ints
+from .lazy import LazyConstants
+from .work import ArrayPermPair
+from .components import components
+from .canonical import canonical_form
+from .decompose import decompose
 
 
 def permpair_from_iterable(ints):
 
-    return PermPair(*aaa_from_bytes(bytes_from_ints('L', ints)))
+    return ArrayPermPair.from_iterable(ints)
+
+_lazy = LazyConstants(__name__)
+__getattr__ = _lazy.module_getattr
+
+
+def __dir__():
+    return _lazy.module_dir(globals())
 
-A = permpair_from_iterable(A_orig.iter_relabel(6))
-B = permpair_from_iterable(B_orig.iter_relabel(6))
 
-AA = A * A
-AB = A * B
-BB = B * B
+@_lazy.define('A', 'B')
+def _():
+    return (
+        ArrayPermPair.from_relabel(A_orig, 6),
+        ArrayPermPair.from_relabel(B_orig, 6),
+    )
+
+
+@_lazy.define('AA', 'AB', 'BB')
+def _(A, B):
+    return A * A, A * B, B * B
+
 
 def every_relabel_of(permpair):
 
@@ -246,29 +317,53 @@ def every_relabel_of(permpair):
 # As dessins, AA = A + AA_0.
 # As dessins, BB = B + BB_0.
 # As dessins, AB = AB_0
-AA_0 = permpair_from_iterable(AA.iter_relabel(6))
-BB_0 = permpair_from_iterable(BB.iter_relabel(41))
-AB_0 = permpair_from_iterable(AB.iter_relabel(42))
+@_lazy.define('AA_0', 'BB_0', 'AB_0')
+def _(AA, BB, AB):
+    return (
+        ArrayPermPair.from_relabel(AA, 6),
+        ArrayPermPair.from_relabel(BB, 41),
+        ArrayPermPair.from_relabel(AB, 42),
+    )
 
 
 # As dessins, AA_0 * A = 2*AA_0 + AAA_0
-AAA_0 = permpair_from_iterable((AA_0 * A).iter_relabel(3))
+@_lazy.define('AAA_0')
+def _(AA_0, A):
+    return ArrayPermPair.from_relabel(AA_0 * A, 3)
+
 
 # As dessins, AAA_0 * A = 3*AAA_0 + AAAA_0
-AAAA_0 = permpair_from_iterable((AAA_0 * A).iter_relabel(40))
+@_lazy.define('AAAA_0')
+def _(AAA_0, A):
+    return ArrayPermPair.from_relabel(AAA_0 * A, 40)
+
 
 # As dessins, AAAA_0 * A = 4*AAA_0 + AAAAA_0
 # At this point, we won't bother finding the best.
-AAAAA_0 = permpair_from_iterable((AAAA_0 * A).iter_relabel(2))
+@_lazy.define('AAAAA_0')
+def _(AAAA_0, A):
+    return ArrayPermPair.from_relabel(AAAA_0 * A, 2)
+
 
 # As dessins, BB_0 * B = 2*BB_0 + BBB_0
-BBB_0 = permpair_from_iterable((BB_0 * B).iter_relabel(0))
+@_lazy.define('BBB_0')
+def _(BB_0, B):
+    return ArrayPermPair.from_relabel(BB_0 * B, 0)
+
 
 # As dessins, BBBB_0 * B = 3*BBB_0 + BBBB_0
-BBBB_0 = permpair_from_iterable((BBB_0 * B).iter_relabel(1))
+@_lazy.define('BBBB_0')
+def _(BBB_0, B):
+    return ArrayPermPair.from_relabel(BBB_0 * B, 1)
+
 
 # As dessins, BBBBB_0 * B = 4*BBBB_0 + BBBBB_0
-BBBBB_0 = permpair_from_iterable((BBBB_0 * B).iter_relabel(2))
+@_lazy.define('BBBBB_0')
+def _(BBBB_0, B):
+    return ArrayPermPair.from_relabel(BBBB_0 * B, 2)
+
 
 # As dessins, AB * B = AB + AAB_0
-AAB_0 = permpair_from_iterable((AB * A).iter_relabel(1))
+@_lazy.define('AAB_0')
+def _(AB, A):
+    return ArrayPermPair.from_relabel(AB * A, 1)
@@ -0,0 +1,222 @@
+'''Decomposition of permpairs into canonical components
+
+A permpair, such as a product, is a sum of connected dessins. We find
+each component, put it in canonical form, and count how often each
+canonical form occurs. This replaces looking at the sizes from every
+root and picking a good root by hand.
+
+>>> from .work import A4
+>>> for dessin, count in decompose(A4 * A4):
+...     print(len(dessin), count)
+7 1
+42 1
+
+Canonical dessins are interned in a dict, so the same dessin is the
+same object. Pass the same dict to calls that should share dessins.
+By default each call has its own, so nothing outlives the value.
+>>> interned = {}
+>>> decompose(A4, interned)[0][0] is decompose(A4 * A4, interned)[0][0]
+True
+>>> decompose(A4)[0][0] is decompose(A4 * A4)[0][0]
+False
+
+The decompositions of products are memoized by the canonical forms of
+their factors, so isomorphic factors, in any order, are decomposed
+once. The memo holds at most MEMO_VALUES values of canonical forms,
+and drops those used least recently first.
+>>> from .computations import AA_0, A
+>>> from .work import ArrayPermPair
+>>> clear_memo()
+>>> other = ArrayPermPair.from_relabel(AA_0, 5)
+>>> first = decompose_product(AA_0, A, interned=interned)
+>>> first == decompose_product(A, other, interned=interned)
+True
+>>> memo_stats()
+{'hits': 1, 'misses': 1, 'entries': 1, 'values': 602}
+'''
+
+import collections
+
+from . import instrument
+from .canonical import automorphism_generators
+from .canonical import canonical_form
+from .components import component_roots
+from .components import components
+from .components import iter_component_permpairs
+from .permtools import cartprod_array
+from .work import ArrayPermPair
+from .work import ProductPermPair
+
+MEMO_VALUES = 1 << 22
+
+# Sorted canonical forms of factors -> (counts, values).
+_memo = collections.OrderedDict()
+_memo_stats = dict(hits=0, misses=0, values=0)
+
+
+def decompose(permpair, interned=None):
+    '''Return list of (dessin, multiplicity) pairs for permpair.
+
+    Each dessin is an ArrayPermPair in canonical form, so relabelling
+    it from 0 gives its canonical form. The list is sorted by degree,
+    and then by canonical form. Dessins are looked up in, and added
+    to, the dict interned, if given.
+
+    This is not memoized, as the canonical forms of the components
+    are what it computes. For products, use decompose_product.
+
+    >>> from .work import ArrayPermPair
+    >>> three_loops = ArrayPermPair([0, 1, 2], [0, 1, 2])
+    >>> [(len(dessin), count) for dessin, count in decompose(three_loops)]
+    [(1, 3)]
+    '''
+
+    if interned is None:
+        interned = {}
+
+    with instrument.stage('decompose'):
+        counts = {}
+        for component in iter_component_permpairs(permpair):
+            canon, orbit = canonical_form(component)
+            counts[canon] = counts.get(canon, 0) + 1
+
+        return _sorted_dessins(counts, interned)
+
+
+def decompose_product(*factors, interned=None, memo=True):
+    '''As decompose(PermPair.product(*factors)), but using symmetry.
+
+    The product of the automorphism groups of the factors acts on the
+    product, and permutes its components. Components in the same
+    orbit are isomorphic, so we put only one from each orbit into
+    canonical form. The factors must be connected. The value is
+    memoized, unless memo is false.
+
+    >>> from .computations import AAAA_0, A
+    >>> [(len(d), count) for d, count in decompose_product(AAAA_0, A)]
+    [(840, 4), (2520, 1)]
+    >>> decompose_product(A, AAAA_0 * A)
+    Traceback (most recent call last):
+    ValueError: Factors must be connected
+    >>> interned = {}
+    >>> value = decompose_product(AAAA_0, A, interned=interned)
+    >>> value == decompose(AAAA_0 * A, interned)
+    True
+    '''
+
+    if interned is None:
+        interned = {}
+
+    # The product of the canonical factors, in sorted order, is
+    # isomorphic to the product of the factors.
+    canonical = []
+    for factor in factors:
+        canon = canonical_form(factor)[0]
+        if len(canon) != 2 * len(factor):
+            raise ValueError('Factors must be connected')
+        canonical.append(canon)
+    key = tuple(sorted(canonical, key=lambda canon: (len(canon), canon)))
+
+    with instrument.stage('decompose'):
+        entry = _memo.get(key) if memo else None
+        if entry is None:
+            dessins = [ArrayPermPair.from_iterable(canon) for canon in key]
+            counts = _product_counts(dessins)
+            if memo:
+                _memo_stats['misses'] += 1
+                _remember(key, counts)
+        else:
+            _memo_stats['hits'] += 1
+            _memo.move_to_end(key)
+            counts = entry[0]
+
+        return _sorted_dessins(counts, interned)
+
+
+def memo_stats():
+    '''Return dict of hits, misses, entries and values of the memo.'''
+
+    return dict(
+        hits=_memo_stats['hits'],
+        misses=_memo_stats['misses'],
+        entries=len(_memo),
+        values=_memo_stats['values'],
+    )
+
+
+def clear_memo():
+
+    _memo.clear()
+    _memo_stats.update(hits=0, misses=0, values=0)
+
+
+def _remember(key, counts):
+    '''Keep counts for key, dropping the least recently used.'''
+
+    values = sum(map(len, key)) + sum(map(len, counts))
+    if values > MEMO_VALUES:
+        return                  # Would drop everything, so don't keep.
+
+    _memo[key] = counts, values
+    _memo_stats['values'] += values
+    while _memo_stats['values'] > MEMO_VALUES:
+        old_key, (old_counts, old_values) = _memo.popitem(last=False)
+        _memo_stats['values'] -= old_values
+
+
+def _product_counts(factors):
+    '''Return dict of canonical form -> count, for the product.'''
+
+    product = ProductPermPair(factors).materialize()
+    labels, sizes = components(product)
+    roots = component_roots(labels, len(sizes))
+
+    # Generators of the group, acting on the edges of the product.
+    generators = []
+    for i, factor in enumerate(factors):
+        perms = [range(len(other)) for other in factors]
+        for generator in automorphism_generators(factor):
+            perms[i] = generator
+            generators.append(cartprod_array(*perms))
+
+    # Find the orbits of components, by search.
+    counts = {}
+    seen = bytearray(len(sizes))
+    for label in range(len(sizes)):
+
+        if seen[label]:
+            continue
+
+        seen[label] = True
+        orbit = [label]
+        for other in orbit:     # Grows as we go.
+            for generator in generators:
+                image = labels[generator[roots[other]]]
+                if not seen[image]:
+                    seen[image] = True
+                    orbit.append(image)
+
+        component = ArrayPermPair.from_relabel(product, roots[label])
+        canon = canonical_form(component)[0]
+        counts[canon] = counts.get(canon, 0) + len(orbit)
+
+    return counts
+
+
+def _sorted_dessins(counts, interned):
+
+    value = []
+    for canon in sorted(counts, key=lambda canon: (len(canon), canon)):
+        value.append((intern_dessin(canon, interned), counts[canon]))
+
+    return value
+
+
+def intern_dessin(canon, interned):
+    '''Return the ArrayPermPair for canonical form canon, from interned.'''
+
+    dessin = interned.get(canon)
+    if dessin is None:
+        dessin = interned[canon] = ArrayPermPair.from_iterable(canon)
+
+    return dessin
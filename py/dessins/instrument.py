@@ -0,0 +1,169 @@
+'''Opt-in instrumentation of the hot paths
+
+Instrumentation is off unless enabled, by the instrumented() context
+manager, or by setting the environment variable DESSINS_INSTRUMENT to
+the path of a JSON file for the report (or to '-' for stderr), which
+is then written when the process exits.
+
+>>> from .computations import AAAA_0, A
+>>> from .decompose import decompose
+>>> with instrumented() as recorder:
+...     dessins = decompose(AAAA_0 * A, interned={})
+>>> recorder.counters['alpha_beta'], recorder.counters['relabel_alloc']
+(55466, 1)
+>>> sorted(recorder.stages)
+['canonical', 'components', 'decompose', 'product', 'relabel']
+>>> recorder.stages['decompose']['calls']
+1
+
+Calls of Relabel.forward and backward are counted as relabel_forward
+and relabel_backward, for a Relabel made while enabled. The kernels
+that use its tables directly count only alpha and beta evaluations.
+
+When off, each instrumented operation pays for one test of a module
+global. Counts are added once per operation, not once per edge, so
+the inner loops keep their speed. Timing is per stage, and stages
+can nest. With memory=True, tracemalloc gives the peak memory of
+each stage, but slows everything down.
+'''
+
+import atexit
+import collections
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+FORMAT_VERSION = 1
+
+_recorder = None                # The active Recorder, or None.
+_null_context = contextlib.nullcontext()
+
+
+class Recorder:
+    '''Counters, and time and memory for each stage.'''
+
+    def __init__(self, memory=False):
+
+        self.memory = memory
+        self.counters = collections.Counter()
+        self.stages = {}        # name -> dict of calls, seconds, peak
+        self._peaks = []        # Peak memory so far, of open stages.
+
+
+    @contextlib.contextmanager
+    def stage(self, name):
+
+        if self.memory:
+            self._enter_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = self._exit_memory() if self.memory else None
+
+            entry = self.stages.get(name)
+            if entry is None:
+                entry = self.stages[name] = dict(calls=0, seconds=0.0, peak=None)
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            if peak is not None:
+                entry['peak'] = max(entry['peak'] or 0, peak)
+
+
+    def report(self):
+        '''Return the counts and stages, as a dict ready for JSON.'''
+
+        return dict(
+            format_version=FORMAT_VERSION,
+            counters=dict(sorted(self.counters.items())),
+            stages=dict(sorted(self.stages.items())),
+        )
+
+
+    def write(self, path):
+        '''Write report as JSON to path, or to stderr if path is '-'.'''
+
+        text = json.dumps(self.report(), indent=2)
+        if path == '-':
+            print(text, file=sys.stderr)
+        else:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+
+
+    def _enter_memory(self):
+
+        # tracemalloc has a single peak, so save the peak of the
+        # enclosing stage before resetting it.
+        current, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            self._peaks[-1][1] = max(self._peaks[-1][1], peak)
+        self._peaks.append([current, current])
+        tracemalloc.reset_peak()
+
+
+    def _exit_memory(self):
+
+        start, peak = self._peaks.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        if self._peaks:
+            self._peaks[-1][1] = max(self._peaks[-1][1], peak)
+        return peak - start
+
+
+@contextlib.contextmanager
+def instrumented(memory=False):
+    '''Enable instrumentation in the block, and yield the Recorder.'''
+
+    global _recorder
+
+    recorder = Recorder(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+
+    previous, _recorder = _recorder, recorder
+    try:
+        yield recorder
+    finally:
+        _recorder = previous
+        if started:
+            tracemalloc.stop()
+
+
+def stage(name):
+    '''Return context manager, that times the stage if enabled.'''
+
+    if _recorder is None:
+        return _null_context
+    return _recorder.stage(name)
+
+
+def enabled():
+    '''Return True if instrumentation is enabled.'''
+
+    return _recorder is not None
+
+
+def count(name, amount=1):
+    '''Add amount to the counter name, if enabled.'''
+
+    if _recorder is not None:
+        _recorder.counters[name] += amount
+
+
+def _enable_from_environment():
+
+    global _recorder
+
+    path = os.environ.get('DESSINS_INSTRUMENT')
+    if path:
+        _recorder = Recorder()
+        atexit.register(_recorder.write, path)
+
+
+_enable_from_environment()
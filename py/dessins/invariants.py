@@ -0,0 +1,156 @@
+'''Invariants of dessins, for fast rejection of isomorphism
+
+Isomorphic permpairs have the same fingerprint. The fingerprint takes
+linear time to compute, while the canonical form can take much longer.
+So we compare fingerprints first, and canonical forms only if the
+fingerprints are equal.
+
+>>> from .work import A4, B4
+>>> fingerprint(A4)
+(7, 1, 0, (3, 2, 2), (2, 2, 1, 1, 1), (7,))
+
+The fingerprint is not a complete invariant. For example A and B are
+trees with the same passport, but are not isomorphic.
+>>> fingerprint(A4) == fingerprint(B4)
+True
+'''
+
+from .canonical import canonical_form
+from .components import components
+from .permalgebra import compose
+from .permtools import cycle_type
+
+
+def fingerprint(permpair):
+    '''Return tuple of invariants of permpair.
+
+    The invariants are degree, number of components, genus, and the
+    cycle types of alpha, beta and alpha followed by beta. The genus
+    is summed over the components.
+
+    >>> from .work import ArrayPermPair
+    >>> fingerprint(ArrayPermPair([1, 0], [1, 0]))
+    (2, 1, 0, (2,), (2,), (1, 1))
+    '''
+
+    permpair = permpair.materialize()
+    alphas = permpair.alpha_array
+    betas = permpair.beta_array
+    degree = len(permpair)
+
+    faces = compose(alphas, betas)
+    alpha_type = cycle_type(alphas)
+    beta_type = cycle_type(betas)
+    face_type = cycle_type(faces)
+    count = len(components(permpair)[1])
+
+    # Euler: V - E + F = 2 * count - 2 * genus.
+    euler = len(alpha_type) + len(beta_type) - degree + len(face_type)
+    genus = (2 * count - euler) // 2
+
+    return degree, count, genus, alpha_type, beta_type, face_type
+
+
+class FingerprintIndex:
+    '''Collection of connected dessins, up to isomorphism.
+
+    The dessins are stored by fingerprint, and canonical forms are
+    computed only when fingerprints collide.
+
+    >>> from .computations import A, B, AA_0, AB_0
+    >>> index = FingerprintIndex()
+    >>> index.add(A, 'A')
+    'A'
+    >>> index.add(AA_0, 'AA_0')
+    'AA_0'
+
+    Adding an isomorphic dessin returns the value already there. Here
+    the fingerprints match, so canonical forms are compared.
+    >>> from .work import A4
+    >>> index.add(A4, 'A4')
+    'A'
+    >>> index.canonical_count
+    2
+
+    Most dessins are rejected by fingerprint alone, but not all.
+    >>> index.get(AB_0) is None, index.canonical_count
+    (True, 2)
+    >>> index.get(B) is None, index.canonical_count
+    (True, 3)
+    >>> len(index)
+    2
+
+    A disconnected permpair is refused, as its canonical form is that
+    of its smallest component only.
+    >>> from .work import ArrayPermPair
+    >>> index.get(ArrayPermPair([1, 0, 2], [1, 0, 2]))
+    Traceback (most recent call last):
+    ValueError: Permpair must be connected
+    '''
+
+    def __init__(self):
+
+        # Fingerprint -> list of [permpair, canonical or None, value].
+        self._buckets = {}
+        self._size = 0
+        self.canonical_count = 0
+
+
+    def __len__(self):
+        return self._size
+
+
+    def get(self, permpair, default=None):
+        '''Return value for dessin isomorphic to permpair, or default.'''
+
+        bucket = self._buckets.get(_connected_fingerprint(permpair))
+        if not bucket:
+            return default      # The fast rejection.
+
+        canon = self._canonical(permpair)
+        for entry in bucket:
+            if entry[1] is None:
+                entry[1] = self._canonical(entry[0])
+            if entry[1] == canon:
+                return entry[2]
+
+        return default
+
+
+    def add(self, permpair, value):
+        '''Add permpair with value, unless already there.
+
+        Return the value stored, which is value if permpair is new.
+        '''
+
+        key = _connected_fingerprint(permpair)
+        bucket = self._buckets.setdefault(key, [])
+
+        if bucket:
+            canon = self._canonical(permpair)
+            for entry in bucket:
+                if entry[1] is None:
+                    entry[1] = self._canonical(entry[0])
+                if entry[1] == canon:
+                    return entry[2]
+        else:
+            # Don't compute the canonical form until we need it.
+            canon = None
+
+        bucket.append([permpair, canon, value])
+        self._size += 1
+        return value
+
+
+    def _canonical(self, permpair):
+
+        self.canonical_count += 1
+        return canonical_form(permpair)[0]
+
+
+def _connected_fingerprint(permpair):
+
+    value = fingerprint(permpair)
+    if value[1] > 1:
+        raise ValueError('Permpair must be connected')
+    return value
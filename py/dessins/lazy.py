@@ -0,0 +1,190 @@
+'''Module constants computed on first use
+
+Some modules define constants that are expensive to compute. Rather
+than compute them on import, a module registers how to compute each
+one, and uses the registry as its module __getattr__ (PEP 562).
+
+>>> lazy = LazyConstants('example')
+>>> @lazy.define('ONE')
+... def _():
+...     print('Computing ONE')
+...     return 1
+>>> @lazy.define('TWO', 'THREE')
+... def _(ONE):
+...     return ONE + 1, ONE + 2
+
+The arguments of a definition are the names of other constants.
+>>> lazy.get('THREE')
+Computing ONE
+3
+>>> lazy.get('ONE'), lazy.get('TWO')
+(1, 2)
+
+Unknown names raise AttributeError, as a module would.
+>>> lazy.get('FOUR')
+Traceback (most recent call last):
+AttributeError: module 'example' has no attribute 'FOUR'
+
+If the environment variable DESSINS_CACHE names a directory, values
+are also pickled there, and reused by later processes. The cache key
+is a hash of the source of the module that defines the constant, and
+of the keys of the constants it uses. So any edit to that module
+recomputes its constants. Change CACHE_VERSION if a change to some
+other module makes the cached values stale. A cache file that can't
+be read is ignored, and the value recomputed.
+'''
+
+import functools
+import hashlib
+import inspect
+import marshal
+import os
+import pickle
+import sys
+
+from .othertools import atomic_write
+
+CACHE_VERSION = 1
+
+
+class LazyConstants:
+
+    def __init__(self, module_name):
+
+        self.module_name = module_name
+        self._definitions = {}  # name -> (names, func)
+        self._values = {}
+        self._keys = {}
+
+
+    def define(self, *names):
+        '''Decorator, that registers func as defining names.'''
+
+        def decorator(func):
+
+            for name in names:
+                if name in self._definitions:
+                    raise ValueError('Already defined: %s' % name)
+                self._definitions[name] = names, func
+            return func
+
+        return decorator
+
+
+    def names(self):
+
+        return sorted(self._definitions)
+
+
+    def get(self, name):
+        '''Return value of constant, computing it if need be.'''
+
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+
+        if name not in self._definitions:
+            msg = 'module %r has no attribute %r'
+            raise AttributeError(msg % (self.module_name, name))
+
+        names, func = self._definitions[name]
+        path = self._cache_path(name)
+        values = _load(path)
+        if values is None:
+            args = [self.get(param) for param in _params(func)]
+            values = func(*args)
+            if len(names) == 1:
+                values = (values,)
+            _save(path, values)
+
+        self._values.update(zip(names, values))
+        return self._values[name]
+
+
+    def key(self, name):
+        '''Return hash of the definition of name, and its inputs.'''
+
+        if name not in self._keys:
+
+            names, func = self._definitions[name]
+            sha = hashlib.sha256()
+            sha.update(repr((CACHE_VERSION, self.module_name, names)).encode())
+            sha.update(_func_source(func))
+            sha.update(_module_source(func.__module__).encode())
+            for param in _params(func):
+                sha.update(self.key(param).encode())
+
+            self._keys[name] = sha.hexdigest()
+
+        return self._keys[name]
+
+
+    def module_getattr(self, name):
+        '''For use as module __getattr__.'''
+
+        return self.get(name)
+
+
+    def module_dir(self, module_globals):
+        '''For use as module __dir__.'''
+
+        return sorted(set(module_globals) | set(self._definitions))
+
+
+    def _cache_path(self, name):
+
+        cache_dir = os.environ.get('DESSINS_CACHE')
+        if not cache_dir:
+            return None
+
+        return os.path.join(cache_dir, self.key(name) + '.pickle')
+
+
+def _params(func):
+
+    return tuple(inspect.signature(func).parameters)
+
+
+def _func_source(func):
+
+    # Without source, as in a zipapp, the code object will do.
+    try:
+        return inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        return marshal.dumps(func.__code__)
+
+
+@functools.lru_cache(maxsize=None)
+def _module_source(module_name):
+
+    try:
+        return inspect.getsource(sys.modules[module_name])
+    except (KeyError, OSError, TypeError):
+        return ''
+
+
+def _load(path):
+
+    if path is None:
+        return None
+
+    # A missing, truncated or incompatible file is a cache miss, as is
+    # one that refers to a class or module no longer there.
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError,
+            AttributeError, ImportError, TypeError):
+        return None
+
+
+def _save(path, values):
+
+    if path is None:
+        return
+
+    # Other processes never see a partly written file.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with atomic_write(path) as f:
+        pickle.dump(values, f, pickle.HIGHEST_PROTOCOL)
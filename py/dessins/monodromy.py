@@ -0,0 +1,302 @@
+'''Monodromy groups of dessins, by the Schreier-Sims algorithm
+
+The monodromy group of a permpair is the group of permutations of its
+edges generated by alpha and beta. We find a base and strong
+generating set (BSGS), and from it the order of the group, and a test
+for membership.
+
+>>> from .computations import A, B
+>>> group = monodromy_group(A)
+>>> group.order(), len(group.base)
+(2520, 5)
+>>> monodromy_group(B).order()
+2520
+
+Both are the alternating group A7. The products of A with itself have
+the same group, acting on more points.
+>>> from .computations import AAAAA_0
+>>> group = monodromy_group(AAAAA_0)
+>>> group.order(), group.degree, len(group.base)
+(2520, 2520, 1)
+>>> group.generators[0] in group
+True
+
+First random elements are sifted through the stabilizer chain, until
+enough of them in a row sift to the identity. Then every Schreier
+generator is sifted, which proves the chain is complete. For a large
+group this second step takes most of the time.
+
+Each level of the chain stores its orbit as a Schreier vector: for
+each point, the index of the generator that first reached it. This
+takes one integer per point, rather than one permutation.
+'''
+
+from array import array
+import random
+
+from .permalgebra import as_perm
+from .permalgebra import compose
+from .permalgebra import invert
+from .permalgebra import is_identity
+
+
+class PermGroup:
+    '''Group generated by permutations of range(degree), with a BSGS.
+
+    >>> group = PermGroup([[1, 2, 3, 0], [1, 0, 2, 3]])
+    >>> group.order()
+    24
+    >>> [3, 2, 1, 0] in group
+    True
+    >>> len(PermGroup([[1, 2, 3, 0], [2, 3, 0, 1]]).strong_generators)
+    1
+    >>> PermGroup([], degree=3).order(), PermGroup([[0, 1, 2]]).order()
+    (1, 1)
+
+    With verify=False, the order could be too small, but with
+    probability less than 2 ** -sifts.
+    '''
+
+    def __init__(self, generators, degree=None, sifts=30, seed=None, verify=True):
+
+        generators = [as_perm(gen) for gen in generators]
+        if degree is None:
+            if not generators:
+                raise ValueError('Need the degree, or a generator')
+            degree = len(generators[0])
+        if any(len(gen) != degree for gen in generators):
+            raise ValueError('Generators must all have the same degree')
+
+        self.degree = degree
+        self.generators = generators
+        self.base = []
+        self._identity = as_perm(range(degree))
+        self._strong = []       # List of (perm, inverse) pairs.
+        self._levels = []
+
+        for gen in generators:
+            self._include(gen)
+        if not self._strong:
+            return              # Trivial group, with nothing to sift.
+
+        self._random_schreier_sims(sifts, random.Random(seed))
+        if verify:
+            self._verify()
+
+
+    def order(self):
+        '''Return the number of elements of the group.'''
+
+        value = 1
+        for level in self._levels:
+            value *= len(level.orbit)
+        return value
+
+
+    def __contains__(self, perm):
+
+        if len(perm) != self.degree:
+            return False
+
+        residue, level = self._sift(as_perm(perm))
+        return is_identity(residue)
+
+
+    @property
+    def strong_generators(self):
+
+        return [array('L', map(int, perm)) for perm, inverse in self._strong]
+
+
+    def orbit(self, level=0):
+        '''Return orbit of the base point at level, under its stabilizer.'''
+
+        return list(self._levels[level].orbit)
+
+
+    def _include(self, perm):
+        '''Add perm to the strong generators, if it doesn't sift.'''
+
+        residue, level = self._sift(perm)
+        if is_identity(residue):
+            return False
+
+        self._add_strong(residue, level)
+        return True
+
+
+    def _random_schreier_sims(self, sifts, rng):
+
+        elements = _RandomElements(self.generators, self._identity, rng)
+        misses = 0
+        while misses < sifts and self.generators:
+            if self._include(elements.next()):
+                misses = 0
+            else:
+                misses += 1
+
+
+    def _verify(self):
+        '''Sift every Schreier generator, from the bottom level up.'''
+
+        done = False
+        while not done:
+            done = True
+            for index in reversed(range(len(self._levels))):
+                if not self._verify_level(index):
+                    done = False
+                    break
+
+
+    def _verify_level(self, index):
+        '''Return False if a Schreier generator at index had to be added.'''
+
+        level = self._levels[index]
+        strong = self._strong
+        for point in level.orbit:
+            coset = level.transversal(point, strong, self._identity)
+            for k in level.generators:
+
+                perm = strong[k][0]
+                image = perm[point]
+                if level.labels[image] == k and strong[k][1][image] == point:
+                    continue        # An edge of the tree, so trivial.
+
+                schreier = level.unwind(compose(coset, perm), image, strong)
+                residue, end = self._sift(schreier, index + 1)
+                if not is_identity(residue):
+                    self._add_strong(residue, end)
+                    return False
+
+        return True
+
+
+    def _sift(self, perm, start=0):
+        '''Return residue of perm, and the level where sifting stopped.'''
+
+        for index in range(start, len(self._levels)):
+            level = self._levels[index]
+            image = perm[level.point]
+            if level.labels[image] == _Level.ABSENT:
+                return perm, index
+            perm = level.unwind(perm, image, self._strong)
+
+        return perm, len(self._levels)
+
+
+    def _add_strong(self, perm, end):
+        '''Add perm, which fixes the base points before end.'''
+
+        if end == len(self._levels):
+            # Extend the base, by a point that perm moves.
+            point = next(i for i in range(self.degree) if perm[i] != i)
+            self.base.append(point)
+            self._levels.append(_Level(point, self.degree))
+
+        self._strong.append((perm, invert(perm)))
+        k = len(self._strong) - 1
+        for level in self._levels[:end + 1]:
+            level.generators.append(k)
+            level.build(self._strong)
+
+
+class _Level:
+    '''A base point, its stabilizer's strong generators, and orbit.'''
+
+    ROOT = -2                   # Label of the base point.
+    ABSENT = -1                 # Label of points not in the orbit.
+
+    def __init__(self, point, degree):
+
+        self.point = point
+        self.generators = []    # Indexes into the strong generators.
+        self.labels = array('l', [self.ABSENT]) * degree
+        self.orbit = [point]
+
+
+    def build(self, strong):
+        '''Recompute the orbit and Schreier vector, by breadth first search.'''
+
+        labels = self.labels
+        for point in self.orbit:
+            labels[point] = self.ABSENT
+        labels[self.point] = self.ROOT
+
+        orbit = [self.point]
+        for point in orbit:     # Grows as we go.
+            for k in self.generators:
+                image = strong[k][0][point]
+                if labels[image] == self.ABSENT:
+                    labels[image] = k
+                    orbit.append(image)
+
+        self.orbit = orbit
+
+
+    def unwind(self, perm, image, strong):
+        '''Return perm followed by the inverse of the coset for image.'''
+
+        labels = self.labels
+        while labels[image] != self.ROOT:
+            inverse = strong[labels[image]][1]
+            perm = compose(perm, inverse)
+            image = inverse[image]
+
+        return perm
+
+
+    def transversal(self, image, strong, identity):
+        '''Return the coset representative, that takes point to image.'''
+
+        path = []
+        labels = self.labels
+        while labels[image] != self.ROOT:
+            k = labels[image]
+            path.append(k)
+            image = strong[k][1][image]
+
+        perm = identity
+        for k in reversed(path):
+            perm = compose(perm, strong[k][0])
+
+        return perm
+
+
+class _RandomElements:
+    '''Nearly uniform random elements, by product replacement.'''
+
+    def __init__(self, generators, identity, rng, size=10, warmup=50):
+
+        self.rng = rng
+        self.state = [generators[i % len(generators)] for i in range(size)]
+        self.accumulator = identity
+        for i in range(warmup):
+            self.next()
+
+
+    def next(self):
+
+        i, j = self.rng.sample(range(len(self.state)), 2)
+        if self.rng.random() < 0.5:
+            self.state[i] = compose(self.state[i], self.state[j])
+        else:
+            self.state[i] = compose(self.state[j], self.state[i])
+        self.accumulator = compose(self.accumulator, self.state[i])
+        return self.accumulator
+
+
+def monodromy_group(permpair, **kwargs):
+    '''Return PermGroup generated by alpha and beta of permpair.
+
+    The permpair can also be a pair of sequences.
+    >>> monodromy_group(([1, 0, 2], [0, 2, 1])).order()
+    6
+    '''
+
+    if hasattr(permpair, 'alpha'):
+        permpair = permpair.materialize()
+        perms = permpair.alpha_array, permpair.beta_array
+    else:
+        perms = permpair
+
+    return PermGroup(perms, len(perms[0]), **kwargs)
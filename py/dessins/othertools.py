@@ -1,6 +1,9 @@
 '''Other tools'''
 
+import contextlib
+import os
 import string
+import tempfile
 
 BASE62_CHARS = string.digits + string.ascii_letters
 BASE62_LOOKUP = dict(zip(BASE62_CHARS, range(len(BASE62_CHARS))))
@@ -45,6 +48,38 @@ def str62_from_bytes(seq):
         raise ValueError(repr(seq))
 
 
+@contextlib.contextmanager
+def atomic_write(path):
+    '''Yield binary file, whose contents replace path on success.
+
+    We write to a temporary file in the same directory, and then
+    rename it. So readers, and any memory maps of path, never see a
+    partial file. On error the temporary file is removed.
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'data')
+    >>> with atomic_write(path) as f:
+    ...     _ = f.write(b'abc')
+    >>> with atomic_write(path) as f:
+    ...     _ = f.write(b'def')
+    ...     raise KeyError
+    Traceback (most recent call last):
+    KeyError
+    >>> os.listdir(os.path.dirname(path)), open(path, 'rb').read()
+    (['data'], b'abc')
+    '''
+
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 class SetDiff(tuple):
     '''Record and update difference between two sets
 
@@ -0,0 +1,118 @@
+'''Canonical forms, computed by a pool of processes
+
+The roots of a permpair can be searched independently. We put the
+alpha and beta arrays in shared memory, so each worker process maps
+them without a copy, and give each worker a range of roots. A worker
+sends back only the roots of its range with the best relabelling, as
+found by canonical_orbit, without building that relabelling. We then
+compare the best root of each range, to find the canonical form.
+
+The workers also share the best root found so far, in the same
+shared memory, and prune against it. Without this, each range would
+start from a poor best, and compare its first roots a long way.
+
+>>> from .work import A4
+>>> parallel_canonical_form(A4, processes=2)
+((1, 0, 0, 2, 3, 1, 4, 3, 2, 5, 6, 4, 5, 6), (6,))
+'''
+
+from array import array
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+import os
+
+from .canonical import canonical_form
+from .canonical import canonical_orbit
+from .work import ArrayPermPair
+
+# Set in each worker process by _init_worker.
+_worker_state = {}
+
+
+def parallel_canonical_form(permpair, processes=None, chunks=None):
+    '''As canonical_form(permpair), but spread roots over processes.
+
+    The roots are split into chunks ranges, by default four for each
+    process, so that fast and slow ranges even out.
+
+    Each range is pruned against the best root shared by all the
+    workers, and roots are followed only as far as comparison needs.
+    So the total work is close to that of canonical_form, however many
+    chunks. The parent then compares one root from each range, and
+    builds one relabelling.
+    '''
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if chunks is None:
+        chunks = 4 * processes
+
+    length = len(permpair)
+    if processes == 1 or length < 2:
+        return canonical_form(permpair)
+
+    permpair = permpair.materialize()
+    # Alpha, beta, and then the best root so far.
+    size = (2 * length + 1) * array('L').itemsize
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        values = shm.buf.cast('L')
+        values[:length] = _as_L(permpair.alpha_array)
+        values[length:2 * length] = _as_L(permpair.beta_array)
+        values[2 * length] = 0
+        values.release()
+
+        step = -(-length // chunks)     # Ceiling division.
+        ranges = [
+            (lo, min(lo + step, length)) for lo in range(0, length, step)
+        ]
+        with Pool(processes, _init_worker, (shm.name, length)) as pool:
+            orbits = pool.map(_worker_canonical_orbit, ranges)
+
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Compare the ranges by their first best roots. Every root of a
+    # range's orbit has the same relabelling, so we keep the orbits of
+    # the ranges that tie. A range beaten by the shared root has none.
+    orbits = [orbit for orbit in orbits if orbit]
+    firsts = [orbit[0] for orbit in orbits]
+    canon, best_roots = canonical_form(permpair, firsts)
+    best_roots = set(best_roots)
+    orbit = []
+    for roots in orbits:
+        if roots[0] in best_roots:
+            orbit.extend(roots)
+
+    return canon, tuple(sorted(orbit))
+
+
+def _as_L(seq):
+
+    if isinstance(seq, array) and seq.typecode == 'L':
+        return seq
+    else:
+        return array('L', seq)
+
+
+def _init_worker(name, length):
+
+    shm = shared_memory.SharedMemory(name=name)
+    values = shm.buf.cast('L')
+    _worker_state['shm'] = shm  # Keep the mapping alive.
+    _worker_state['permpair'] = ArrayPermPair(
+        values[:length],
+        values[length:2 * length],
+    )
+    _worker_state['shared'] = values[2 * length:]
+
+
+def _worker_canonical_orbit(lo_hi):
+
+    lo, hi = lo_hi
+    orbit = canonical_orbit(
+        _worker_state['permpair'], range(lo, hi), _worker_state['shared'])
+
+    # An array pickles much more compactly than a tuple of ints.
+    return array('L', orbit)
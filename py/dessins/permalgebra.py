@@ -0,0 +1,264 @@
+'''Algebra of permutations, stored in arrays
+
+A permutation is a sequence of the integers 0, ..., n-1, such as an
+array('L'). We compose left to right, so compose(p, q) is first p and
+then q, as with alpha followed by beta for the faces of a dessin.
+
+>>> p = array('L', [1, 2, 0, 3])
+>>> q = array('L', [0, 1, 3, 2])
+>>> compose(p, q)
+array('L', [1, 3, 0, 2])
+>>> invert(p)
+array('L', [2, 0, 1, 3])
+>>> power(p, 3) == compose(p, p, p) == array('L', range(4))
+True
+>>> cycle_type_of_product(p, q)
+(4,)
+
+If numpy is installed, each function also takes a batch, which is a
+2-D numpy array with one permutation in each row, and works on every
+row at once. A 1-D permutation is applied to every row of a batch.
+Without numpy a batch is a list of permutations, done one at a time.
+If every argument is a numpy array, so is the value, which saves
+converting to and from array('L') in a loop.
+>>> batch = [[1, 2, 0], [0, 2, 1]]
+>>> [list(map(int, row)) for row in compose(batch, [1, 0, 2])]
+[[0, 2, 1], [1, 2, 0]]
+>>> cycle_type_of_product(batch, batch)
+[(3,), (1, 1, 1)]
+'''
+
+from array import array
+import numbers
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .permtools import cycle_type
+
+
+def as_perm(seq):
+    '''Return seq as a numpy array if numpy is installed, else array('L').
+
+    The functions here are fastest on permutations stored this way.
+    '''
+
+    if numpy is not None:
+        return _as_ndarray(seq)
+    return array('L', seq)
+
+
+def is_identity(perm):
+    '''Return True if perm is the identity permutation.
+
+    >>> is_identity([0, 1, 2]), is_identity(as_perm([0, 2, 1]))
+    (True, False)
+    '''
+
+    if numpy is not None and isinstance(perm, numpy.ndarray):
+        return bool((perm == numpy.arange(len(perm))).all())
+    return list(perm) == list(range(len(perm)))
+
+
+def compose(*perms):
+    '''Return the product of perms, the first applied first.'''
+
+    if not perms:
+        raise ValueError('Need at least one permutation')
+
+    value = perms[0]
+    for perm in perms[1:]:
+        value = _compose(value, perm)
+
+    return _result(value, perms)
+
+
+def invert(perm):
+    '''Return the inverse of perm.'''
+
+    if _is_batch(perm):
+        if numpy is None:
+            return [invert(row) for row in perm]
+
+        perm = _as_ndarray(perm)
+        value = numpy.empty_like(perm)
+        index = numpy.broadcast_to(numpy.arange(perm.shape[1]), perm.shape)
+        numpy.put_along_axis(value, perm, index, axis=1)
+        return value
+
+    if numpy is not None:
+        arg = perm
+        perm = _as_ndarray(perm)
+        value = numpy.empty_like(perm)
+        value[perm] = numpy.arange(len(perm))
+        return _result(value, [arg])
+
+    value = array('L', [0]) * len(perm)
+    for i, j in enumerate(perm):
+        value[j] = i
+    return value
+
+
+def power(perm, exponent):
+    '''Return perm to the exponent, by repeated squaring.
+
+    >>> power([1, 2, 0], -1)
+    array('L', [2, 0, 1])
+    >>> power([1, 2, 0], 0)
+    array('L', [0, 1, 2])
+    '''
+
+    arg = perm
+    if exponent < 0:
+        perm = invert(perm)
+        exponent = -exponent
+
+    value = None                # The identity.
+    square = perm
+    while exponent:
+        if exponent & 1:
+            value = square if value is None else _compose(value, square)
+        exponent >>= 1
+        if exponent:
+            square = _compose(square, square)
+
+    if value is None:
+        return _identity_like(perm)
+
+    return _result(value, [arg])
+
+
+def conjugate(perm, by):
+    '''Return perm, relabelled by the permutation by.
+
+    The value takes by[i] to by[perm[i]], and is compose(by^-1, perm, by).
+    >>> conjugate([1, 0, 2], [2, 0, 1])
+    array('L', [2, 1, 0])
+    '''
+
+    return compose(invert(by), perm, by)
+
+
+def cycle_type_of_product(*perms):
+    '''Return cycle type of compose(*perms), or for a batch a list of them.
+
+    >>> cycle_type_of_product([1, 2, 0, 5, 6, 3, 4], [0, 3, 4, 1, 2, 5, 6])
+    (7,)
+    '''
+
+    value = compose(*perms)
+    if not _is_batch(value):
+        return cycle_type(value)
+
+    if numpy is None:
+        return [cycle_type(row) for row in value]
+
+    # Find the length of the cycle through each point, for all rows
+    # together. The loop runs once for each step of the longest cycle.
+    count, length = value.shape
+    index = numpy.arange(length)
+    lengths = numpy.zeros(value.shape, dtype='q')
+    curr = value
+    step = 1
+    while True:
+        lengths[(curr == index) & (lengths == 0)] = step
+        if lengths.all():
+            break
+        curr = numpy.take_along_axis(value, curr, axis=1)
+        step += 1
+
+    # A cycle of length k has k points, each counted once here.
+    counts = numpy.zeros((count, length + 1), dtype='q')
+    numpy.add.at(counts, (numpy.arange(count)[:, None], lengths), 1)
+    counts //= numpy.maximum(numpy.arange(length + 1), 1)
+
+    result = []
+    for row in counts:
+        cycle_lengths = []
+        for k in numpy.flatnonzero(row)[::-1]:
+            cycle_lengths.extend([int(k)] * int(row[k]))
+        result.append(tuple(cycle_lengths))
+
+    return result
+
+
+def _compose(p, q):
+
+    if _is_batch(p) or _is_batch(q):
+        if numpy is None:
+            if not _is_batch(p):
+                return [_compose(p, row) for row in q]
+            if not _is_batch(q):
+                return [_compose(row, q) for row in p]
+            return [_compose(row, other) for row, other in zip(p, q)]
+
+        p = _as_ndarray(p)
+        q = _as_ndarray(q)
+        if q.ndim == 1:
+            return q[p]
+        p = numpy.broadcast_to(p, q.shape)
+        return numpy.take_along_axis(q, p, axis=1)
+
+    if numpy is not None:
+        return _as_ndarray(q)[_as_ndarray(p)]
+
+    value = array('L')
+    value.fromlist([q[i] for i in p])
+    return value
+
+
+def _identity_like(perm):
+
+    if _is_batch(perm):
+        if numpy is None:
+            return [array('L', range(len(row))) for row in perm]
+
+        perm = _as_ndarray(perm)
+        return numpy.broadcast_to(numpy.arange(perm.shape[1]), perm.shape).copy()
+
+    if numpy is not None and isinstance(perm, numpy.ndarray):
+        return numpy.arange(len(perm), dtype=perm.dtype)
+
+    return array('L', range(len(perm)))
+
+
+def _is_batch(perm):
+
+    if numpy is not None and isinstance(perm, numpy.ndarray):
+        return perm.ndim == 2
+
+    if isinstance(perm, (array, memoryview, bytes, bytearray, range)):
+        return False
+
+    return len(perm) > 0 and not isinstance(perm[0], numbers.Integral)
+
+
+def _as_ndarray(perm):
+
+    if isinstance(perm, numpy.ndarray):
+        return perm
+    elif isinstance(perm, (array, memoryview)):
+        return numpy.asarray(perm).astype('q')
+    else:
+        return numpy.asarray(perm, dtype='q')
+
+
+def _result(value, perms):
+    '''Return a 1-D permutation as array('L'), and leave batches.
+
+    If all of perms are numpy arrays, the value is left as it is.
+    '''
+
+    if numpy is not None and isinstance(value, numpy.ndarray) and value.ndim == 1:
+        if all(isinstance(perm, numpy.ndarray) for perm in perms):
+            return value
+        result = array('L')
+        result.frombytes(value.astype('L').tobytes())
+        return result
+
+    if not isinstance(value, array) and not _is_batch(value):
+        return array('L', value)
+
+    return value
@@ -4,6 +4,9 @@ A permpair is the underlying data of a dessin. A dessin is a permpair,
 up to relabelling, and with additional methods.
 '''
 
+import heapq
+
+from . import instrument
 from .othertools import SetDiff
 from .permtools import iter_seen_cycle
 
@@ -37,13 +40,65 @@ def iter_component_cycles(permpair):
     (('S', 0), ('a', (0, 1, 2)), ('b', (0,)), ('b', (1,)), ('b', (2,)), ('E', 0))
     >>> doit('012', '201')
     (('S', 0), ('a', (0,)), ('b', (0, 2, 1)), ('a', (1,)), ('a', (2,)), ('E', 0))
+
+    The order is that of IterCyclesState. After the first alpha cycle,
+    the next cycle starts at the lowest edge whose alpha cycle is due
+    (its beta cycle is done, but not its alpha cycle), or failing that
+    the lowest edge whose beta cycle is due. We keep the due edges in
+    heaps, so the whole traversal takes O(n log n) time.
     '''
 
-    state = IterCyclesState(permpair)
-    for edge in state.iter_components():
-        yield 'S', edge
-        yield from state.iter_side_cycles()
-        yield 'E', edge
+    alpha, beta = permpair
+    length = len(alpha)
+    done = (bytearray(length), bytearray(length))
+    due = ([], [])              # Heaps of edges, with stale entries.
+    cycles = 0
+
+    for start in range(length):
+
+        if done[0][start]:
+            continue            # Already in a component.
+
+        yield 'S', start
+        side, edge = 0, start
+        while True:
+
+            # Traverse the cycle, and record what is now due.
+            perm = (alpha, beta)[side]
+            side_done = done[side]
+            other_done = done[1 - side]
+            other_due = due[1 - side]
+            cycle = []
+            curr = edge
+            while True:
+                if side_done[curr]:
+                    raise ValueError('Not a permutation')
+                side_done[curr] = True
+                cycle.append(curr)
+                if not other_done[curr]:
+                    heapq.heappush(other_due, curr)
+                curr = perm[curr]
+                if curr == edge:
+                    break
+
+            yield 'ab'[side], tuple(cycle)
+            cycles += 1
+
+            # Find the next cycle, alpha first, discarding stale edges.
+            for side in range(2):
+                heap = due[side]
+                while heap and done[side][heap[0]]:
+                    heapq.heappop(heap)
+                if heap:
+                    edge = heapq.heappop(heap)
+                    break
+            else:
+                break           # Component finished.
+
+        yield 'E', start
+
+    instrument.count('cycles', cycles)
+    instrument.count('alpha_beta', 2 * length)
 
 
 class IterCyclesState:
@@ -141,7 +196,11 @@ def group_component_cycles_filter(comp_cycles):
     comp_cycles = iter(comp_cycles) # Must be an iterator.
     while True:
 
-        key, value = next(comp_cycles)
+        # A bare next() would raise StopIteration in a generator.
+        try:
+            key, value = next(comp_cycles)
+        except StopIteration:
+            return
         if key != 'S':
             raise ValueError
 
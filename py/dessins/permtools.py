@@ -7,6 +7,12 @@ import bisect
 import collections
 import itertools
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from . import instrument
 from .othertools import bytes_from_str62 as perm_from_str
 from .othertools import str62_from_bytes as str_from_perm
 
@@ -41,18 +47,47 @@ class Relabel:
     0
     >>> relabel.forward(4)
     0
+
+    The tables can be reused. Reset takes time proportional to the
+    labels used, not to maxsize.
+    >>> relabel.reset()
+    >>> relabel.size, relabel.forward(9), relabel.forward(4)
+    (0, 0, 1)
+
+    Labels are not limited to bytes.
+    >>> relabel = Relabel(1000)
+    >>> relabel.forward(999), relabel.forward(300), relabel.backward(1)
+    (0, 1, 300)
     '''
 
     def __init__(self, maxsize):
 
         # TODO: Document that len(self) is ambiguous?
         # TODO: Provide read-only views?
-        # TODO: allow for maxsize > 255.
         # TODO: Provide item access methods?
         self._size = 0
         self._zero_origin = None
-        self._backward = array('L', itertools.repeat(0, maxsize))
-        self._forward = array('L', itertools.repeat(0, maxsize))
+        self._backward = array('L', [0]) * maxsize
+        self._forward = array('L', [0]) * maxsize
+        instrument.count('relabel_alloc')
+        instrument.count('alloc_bytes', 2 * maxsize * self._forward.itemsize)
+
+        # Count calls only if enabled, so that otherwise they cost
+        # nothing. Kernels that use the tables directly aren't counted.
+        if instrument.enabled():
+            self.forward = self._counted_forward
+            self.backward = self._counted_backward
+
+
+    def reset(self):
+        '''Clear the relabelling, so the tables can be reused.'''
+
+        forward = self._forward
+        for i in self._backward[:self._size]:
+            forward[i] = 0
+
+        self._size = 0
+        self._zero_origin = None
 
 
     @property
@@ -89,6 +124,145 @@ class Relabel:
         return size             # Before the increment.
 
 
+    def _counted_forward(self, i):
+
+        instrument.count('relabel_forward')
+        return Relabel.forward(self, i)
+
+
+    def _counted_backward(self, i):
+
+        instrument.count('relabel_backward')
+        return Relabel.backward(self, i)
+
+
+def relabel_into(alphas, betas, root, out, relabel):
+    '''Write relabelling of (alphas, betas) from root into out.
+
+    The values written are those yielded by PermPair.iter_relabel,
+    namely new alpha, new beta for each new label in turn. Here out
+    is a writable sequence, at least twice as long as the component,
+    and relabel is a Relabel, used as workspace. Both can be reused.
+    Return the number of values written.
+
+    >>> out = array('L', [0]) * 6
+    >>> relabel = Relabel(3)
+    >>> relabel_into([1, 2, 0], [0, 2, 1], 1, out, relabel)
+    6
+    >>> out
+    array('L', [1, 1, 2, 0, 0, 2])
+    >>> relabel_into([1, 0, 2], [1, 0, 2], 2, out, relabel)
+    2
+    >>> out[:2], relabel.backward(0)
+    (array('L', [0, 0]), 2)
+    '''
+
+    # This is the inner loop of much of our work, so we use the
+    # tables of relabel directly, rather than call its methods.
+    relabel.reset()
+    forward = relabel._forward
+    backward = relabel._backward
+    backward[0] = root
+    size = 1
+    pos = 0
+
+    new_label = 0
+    while new_label < size:
+
+        old_label = backward[new_label]
+        new_label += 1
+
+        # Only the root has new label 0.
+        old = alphas[old_label]
+        new = forward[old]
+        if not new and old != root:
+            new = forward[old] = size
+            backward[size] = old
+            size += 1
+        out[pos] = new
+
+        old = betas[old_label]
+        new = forward[old]
+        if not new and old != root:
+            new = forward[old] = size
+            backward[size] = old
+            size += 1
+        out[pos + 1] = new
+        pos += 2
+
+    relabel._size = size
+    relabel._zero_origin = root
+    instrument.count('alpha_beta', pos)
+    return pos
+
+
+def iter_relabel_chunks(alphas, betas, root, relabel, chunk_size):
+    '''Yield the values of relabel_into, in array('L') chunks.
+
+    The search runs a step at a time, filling a buffer of chunk_size
+    values, and yields a copy of it when full. So memory is that of
+    relabel and one chunk, whatever the size of the component. Here
+    relabel is a Relabel, used as workspace.
+
+    >>> relabel = Relabel(3)
+    >>> list(iter_relabel_chunks([1, 2, 0], [0, 2, 1], 1, relabel, 4))
+    [array('L', [1, 1, 2, 0]), array('L', [0, 2])]
+    >>> list(iter_relabel_chunks([1, 2, 0], [0, 2, 1], 1, relabel, 5))
+    [array('L', [1, 1, 2, 0, 0]), array('L', [2])]
+    '''
+
+    # One spare place, as values are written in pairs.
+    out = array('L', [0]) * (chunk_size + 1)
+
+    # As in relabel_into, but yield out whenever it is full.
+    relabel.reset()
+    forward = relabel._forward
+    backward = relabel._backward
+    backward[0] = root
+    size = 1
+    pos = 0
+    total = 0
+
+    new_label = 0
+    try:
+        while new_label < size:
+
+            old_label = backward[new_label]
+            new_label += 1
+
+            old = alphas[old_label]
+            new = forward[old]
+            if not new and old != root:
+                new = forward[old] = size
+                backward[size] = old
+                size += 1
+            out[pos] = new
+
+            old = betas[old_label]
+            new = forward[old]
+            if not new and old != root:
+                new = forward[old] = size
+                backward[size] = old
+                size += 1
+            out[pos + 1] = new
+            pos += 2
+
+            while pos >= chunk_size:
+                total += chunk_size
+                pos -= chunk_size
+                yield out[:chunk_size]
+                out[0] = out[chunk_size]
+
+        if pos:
+            total += pos
+            yield out[:pos]
+
+    finally:
+        relabel._size = size
+        relabel._zero_origin = root
+        instrument.count('alpha_beta', total)
+
+
 def is_perm(seq):
     '''Return True if seq is permutation of {0, ..., n}.
 
@@ -167,15 +341,154 @@ def iter_cycles(perm):
     cycletype = type(perm)      # Yielded cycle has same type as perm.
 
     start = -1
-    while True:
+    count = 0
+    lookups = 0
+    try:
+        while True:
+
+            # Short cut: If (index <= start) then index is already seen.
+            # GOTCHA: Negative indexing: bytes(6).find(False, -1) == 5
+            start = seen.find(False, start + 1)
+            if start == -1:
+                # Not found, no more cycles, all done.
+                return
+
+            cycle = cycletype(iter_seen_cycle(seen, perm, start))
+            count += 1
+            lookups += len(cycle)
+            yield cycle
+    finally:
+        # Also when the caller stops early.
+        instrument.count('cycles', count)
+        instrument.count('perm_lookups', lookups)
+
+
+def cycles_csr(perm):
+    '''Return (values, offsets), the cycles of perm in CSR layout.
+
+    The cycles are as yielded by iter_cycles, lowest index first, but
+    are stored end to end in values. Cycle i is values[offsets[i]:
+    offsets[i+1]]. Both are array('L'). Works for any sequence of
+    ints, including array, bytes and memoryview.
+
+    >>> values, offsets = cycles_csr(perm_from_str('3214560'))
+    >>> values, offsets
+    (array('L', [0, 3, 4, 5, 6, 1, 2]), array('L', [0, 5, 7]))
+    >>> [list(values[i:j]) for i, j in zip(offsets, offsets[1:])]
+    [[0, 3, 4, 5, 6], [1, 2]]
+
+    >>> cycles_csr([1, 1])
+    Traceback (most recent call last):
+    ValueError: Not a permutation
+    '''
+
+    if numpy is not None:
+        return _cycles_csr_numpy(perm)
+    else:
+        return _cycles_csr_python(perm)
+
+
+def cycle_type(perm):
+    '''Return the cycle lengths of perm, as a partition.
+
+    >>> cycle_type(perm_from_str('3214560'))
+    (5, 2)
+    >>> cycle_type(b'')
+    ()
+    '''
 
-        # Short cut: If (index <= start) then index is already seen.
-        # GOTCHA: Negative indexing: bytes(6).find(False, -1) == 5
+    values, offsets = cycles_csr(perm)
+    lengths = [j - i for i, j in zip(offsets, offsets[1:])]
+    return tuple(sorted(lengths, reverse=True))
+
+
+def _cycles_csr_python(perm):
+    '''Follow each cycle in a plain loop, with no generators.'''
+
+    length = len(perm)
+    seen = bytearray(length)
+    values = array('L')
+    offsets = array('L', [0])
+    append = values.append
+
+    start = seen.find(False)
+    while start != -1:
+
+        curr = start
+        while True:
+            if seen[curr]:
+                raise ValueError('Not a permutation')
+            seen[curr] = True
+            append(curr)
+            curr = perm[curr]
+            if curr == start:
+                break
+
+        offsets.append(len(values))
         start = seen.find(False, start + 1)
-        if start == -1:
-            return              # Not found, no more cycles, all done.
 
-        yield cycletype(iter_seen_cycle(seen, perm, start))
+    return values, offsets
+
+
+def _cycles_csr_numpy(perm):
+    '''Find cycles and positions in them by pointer doubling.
+
+    The start of each cycle is its lowest index. For each index we
+    find its start, and the number of steps to get there, in log2(n)
+    vectorized rounds. From these we get its place in values.
+    '''
+
+    if isinstance(perm, (array, memoryview)):
+        perm = numpy.asarray(perm)
+    elif isinstance(perm, (bytes, bytearray)):
+        perm = numpy.frombuffer(perm, dtype='B')
+    else:
+        perm = numpy.fromiter(perm, dtype='L', count=len(perm))
+    perm = perm.astype('q')         # Signed, to mix with cumsum.
+
+    length = len(perm)
+    if length and (perm.max() >= length
+                   or numpy.bincount(perm, minlength=length).max() != 1):
+        raise ValueError('Not a permutation')
+
+    # Lowest index in each cycle. After k rounds, jump is perm**(2**k),
+    # and start[i] is the lowest of the first 2**k indexes from i.
+    # Stop early once each index agrees with the next, which is soon
+    # if the cycles are short.
+    index = numpy.arange(length, dtype='q')
+    start = index.copy()
+    jump = perm.copy()
+    reach = 1
+    while reach < length:
+        start = numpy.minimum(start, start[jump])
+        if numpy.array_equal(start, start[perm]):
+            break
+        jump = jump[jump]
+        reach *= 2
+
+    # Steps from each index forward to its start, with start absorbing.
+    is_start = start == index
+    jump = numpy.where(is_start, index, perm)
+    steps = (~is_start).astype('q')
+    while not numpy.array_equal(jump, start):
+        steps = steps + steps[jump]
+        jump = jump[jump]
+
+    # Number the cycles by their start, and lay them out in order.
+    cycle = (numpy.cumsum(is_start) - 1)[start]
+    sizes = numpy.bincount(cycle, minlength=int(is_start.sum()))
+    bounds = numpy.concatenate(([0], numpy.cumsum(sizes))).astype('q')
+    sizes_of = sizes[cycle]
+    place = bounds[cycle] + (sizes_of - steps) % sizes_of
+
+    flat = numpy.empty(length, dtype='L')
+    flat[place] = index
+
+    values = array('L')
+    values.frombytes(flat.tobytes())
+    offsets = array('L')
+    offsets.frombytes(bounds.astype('L').tobytes())
+    return values, offsets
 
 
 def iter_cartprod(*perms):
@@ -216,6 +529,65 @@ def iter_cartprod(*perms):
         yield sum(terms)
 
 
+def cartprod_array(*perms):
+    '''Return Cartesian product of permutations, as array('L').
+
+    Same values as iter_cartprod, but computed a block at a time. If
+    numpy is available, the whole product is filled in one broadcast
+    per factor, over the mixed-radix index.
+    >>> cartprod_array(perm_from_str('210'), perm_from_str('0123'))
+    array('L', [8, 9, 10, 11, 4, 5, 6, 7, 0, 1, 2, 3])
+
+    >>> perms = [1, 0], [0, 2, 1], perm_from_str('120')
+    >>> cartprod_array(*perms) == array('L', iter_cartprod(*perms))
+    True
+    '''
+
+    if numpy is not None:
+        value = _cartprod_array_numpy(perms)
+    else:
+        value = _cartprod_array_python(perms)
+
+    instrument.count('alloc_bytes', len(value) * value.itemsize)
+    return value
+
+
+def _cartprod_array_python(perms):
+    '''Extend the product one factor at a time, in rows.
+
+    >>> _cartprod_array_python(([1, 0], [0, 2, 1]))
+    array('L', [3, 5, 4, 0, 2, 1])
+    '''
+
+    value = array('L', [0])
+    for perm in perms:
+        size = len(perm)
+        perm = list(perm)
+        prev, value = value, array('L')
+        for i in prev:
+            base = size * i
+            value.extend([base + j for j in perm])
+
+    return value
+
+
+def _cartprod_array_numpy(perms):
+    '''Extend the product one factor at a time, by broadcasting.'''
+
+    value = numpy.zeros(1, dtype='L')
+    for perm in perms:
+        if isinstance(perm, (array, memoryview)):
+            perm = numpy.asarray(perm)
+        else:
+            perm = numpy.fromiter(perm, dtype='L', count=len(perm))
+        perm = perm.astype('L', copy=False)
+        value = (value[:, None] * len(perm) + perm[None, :]).ravel()
+
+    result = array('L')
+    result.frombytes(value.tobytes())
+    return result
+
+
 def rebase_cycles(cycles):
     '''Rebase cycles, to use {0, 1, ..., n}, with no gaps.
 
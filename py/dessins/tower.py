@@ -0,0 +1,136 @@
+'''Power towers of a dessin, with checkpoints
+
+The tower of a connected dessin P starts with P. Each level multiplies
+the top of the level below by P, and decomposes the product. Its top
+is the largest component not seen lower down. This is how AA_0, AAA_0,
+... in computations were found, one step at a time.
+
+>>> from .computations import A
+>>> for top, decomposition in power_tower(A, 6):
+...     print(len(top), [(len(d), count) for d, count in decomposition])
+7 [(7, 1)]
+42 [(7, 1), (42, 1)]
+210 [(42, 2), (210, 1)]
+840 [(210, 3), (840, 1)]
+2520 [(840, 4), (2520, 1)]
+
+The tower of A stops growing at the fifth level, as the product of
+its top with A has no new component.
+
+If checkpoint_dir is given, each level is saved there as soon as it
+is done. A later call, with the same dessin, reloads the saved levels
+and starts after them. So an interrupted run loses only the level it
+was working on.
+'''
+
+import os
+import pickle
+
+from .canonical import canonical_form
+from .codec import decode_permpair
+from .codec import digest
+from .codec import encode_permpair
+from .decompose import decompose_product
+from .decompose import intern_dessin
+from .othertools import atomic_write
+
+CHECKPOINT_VERSION = 1
+
+
+def power_tower(permpair, levels, checkpoint_dir=None, interned=None):
+    '''Return list of (top, decomposition) pairs, for each level.
+
+    The first level is permpair itself, in canonical form. The list is
+    shorter than levels if the tower stops growing. Each top, and each
+    dessin in a decomposition, is interned in the dict interned, which
+    by default is new for each call.
+    '''
+
+    if interned is None:
+        interned = {}
+
+    base = intern_dessin(canonical_form(permpair)[0], interned)
+    key = digest(base)
+
+    value = _load_checkpoints(checkpoint_dir, key, interned)
+    if not value:
+        value = [(base, [(base, 1)])]
+        _save_checkpoint(checkpoint_dir, key, 1, value[0])
+
+    seen = {id(top) for top, decomposition in value}
+    while len(value) < levels:
+
+        top = value[-1][0]
+        decomposition = decompose_product(top, base, interned=interned)
+
+        # The largest new component, as the list is sorted by degree.
+        new = [dessin for dessin, count in decomposition if id(dessin) not in seen]
+        if not new:
+            break
+
+        level = new[-1], decomposition
+        value.append(level)
+        seen.add(id(new[-1]))
+        _save_checkpoint(checkpoint_dir, key, len(value), level)
+
+    return value[:levels]
+
+
+def _checkpoint_path(checkpoint_dir, key, number):
+
+    return os.path.join(checkpoint_dir, 'tower-%s-%d.pickle' % (key[:16], number))
+
+
+def _save_checkpoint(checkpoint_dir, key, number, level):
+
+    if checkpoint_dir is None:
+        return
+
+    top, decomposition = level
+    data = dict(
+        version=CHECKPOINT_VERSION,
+        key=key,
+        level=number,
+        top=encode_permpair(top, compress=True),
+        decomposition=[
+            (encode_permpair(dessin, compress=True), count)
+            for dessin, count in decomposition
+        ],
+    )
+
+    # A run killed while saving leaves no partial checkpoint.
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    with atomic_write(_checkpoint_path(checkpoint_dir, key, number)) as f:
+        pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+
+
+def _load_checkpoints(checkpoint_dir, key, interned):
+    '''Return the levels saved for key, up to the first one missing.'''
+
+    value = []
+    if checkpoint_dir is None:
+        return value
+
+    while True:
+        path = _checkpoint_path(checkpoint_dir, key, len(value) + 1)
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return value
+
+        if data['version'] != CHECKPOINT_VERSION or data['key'] != key:
+            return value
+
+        top = _intern(data['top'], interned)
+        decomposition = [
+            (_intern(encoded, interned), count)
+            for encoded, count in data['decomposition']
+        ]
+        value.append((top, decomposition))
+
+
+def _intern(encoded, interned):
+
+    dessin = decode_permpair(encoded)
+    return intern_dessin(tuple(dessin.iter_relabel(0)), interned)
@@ -1,5 +1,14 @@
 from array import array
+import itertools
+
+from . import instrument
+from .lazy import LazyConstants
 from .permtools import Relabel
+from .permtools import cartprod_array
+from .permtools import iter_relabel_chunks
+from .permtools import relabel_into
+
+CHUNK_SIZE = 1 << 16            # Values in each chunk yielded.
 
 
 # Lando + Zvonkin, p90, Fig 2.9
@@ -73,6 +82,8 @@ class PermPair:
     >>> len(tuple(AAA.iter_relabel(magic)))
     5040
 
+    The top permpairs are computed on first use.
+    >>> from .work import A_top, B_top
     >>> len(A_top), len(B_top)
     (2520, 2520)
 
@@ -83,6 +94,9 @@ class PermPair:
     >>> #  len(tuple((A_top * B_top).iter_relabel(0)))
     12700800
 
+    A lazy permpair can be materialized into typed arrays.
+    >>> type(A4.materialize()).__name__
+    'ArrayPermPair'
     '''
 
     __slots__ = 'alpha', 'beta', 'length'
@@ -118,40 +132,374 @@ class PermPair:
         return PermPair(alpha, beta, length)
 
 
+    @staticmethod
+    def product(*factors):
+        '''Return the product of factors, as a single flat product.
+
+        >>> AAA = PermPair.product(A4, A4, A4)
+        >>> edges = range(len(AAA))
+        >>> tuple(map(AAA.alpha, edges)) == tuple(map((A4 * A4 * A4).alpha, edges))
+        True
+        '''
+
+        return ProductPermPair(factors)
+
+
+    def materialize(self):
+        '''Return ArrayPermPair with the same alpha and beta.'''
+
+        edges = range(self.length)
+        instrument.count('alpha_beta', 2 * self.length)
+        with instrument.stage('product'):
+            return ArrayPermPair(
+                array('L', map(self.alpha, edges)),
+                array('L', map(self.beta, edges)),
+            )
+
+
     def iter_relabel(self, root):
 
         length = len(self)
         relabel = Relabel(length)
         edge_zero = relabel.forward(root) # Seed the relabelling.
 
-        for new_label in range(length):
+        done = 0                # Labels whose alpha and beta we found.
+        try:
+            for new_label in range(length):
+
+                # Stop when we run out of new labels.
+                if new_label >= relabel.size:
+                    break
+
+                old_label = relabel.backward(new_label)
+                old_alpha = self.alpha(old_label)
+                old_beta = self.beta(old_label)
+                done += 1
+
+                yield relabel.forward(old_alpha)
+                yield relabel.forward(old_beta)
+        finally:
+            instrument.count('alpha_beta', 2 * done)
+
+
+    def relabel_into(self, root, out, relabel):
+        '''Write relabelling from root into out, return count written.
+
+        >>> out, relabel = array('L', [0]) * 14, Relabel(7)
+        >>> A4.relabel_into(6, out, relabel)
+        14
+        >>> tuple(out) == tuple(A4.iter_relabel(6))
+        True
+        '''
+
+        # Lazy permpairs are bound by calls to alpha and beta, so we
+        # just use iter_relabel, and leave relabel unused.
+        count = 0
+        for count, value in enumerate(self.iter_relabel(root), 1):
+            out[count - 1] = value
+        return count
+
+
+    def iter_relabel_chunks(self, root, chunk_size=CHUNK_SIZE):
+        '''As iter_relabel, but yield array('L') chunks of values.
+
+        Each chunk is yielded as soon as it is full, so memory is that
+        of one chunk, and of the relabelling.
+        >>> [len(chunk) for chunk in A4.iter_relabel_chunks(0, 4)]
+        [4, 4, 4, 2]
+        >>> chunks = A4.materialize().iter_relabel_chunks(0, 4)
+        >>> [len(chunk) for chunk in chunks]
+        [4, 4, 4, 2]
+        '''
+
+        values = self.iter_relabel(root)
+        while True:
+            chunk = array('L', itertools.islice(values, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+class ArrayPermPair(PermPair):
+    '''PermPair whose alpha and beta are stored in typed arrays.
+
+    Each lookup is a single index, rather than a chain of closures.
+    >>> A5 = A4.materialize()
+    >>> A5.alpha_array
+    array('L', [1, 2, 0, 5, 6, 3, 4])
+    >>> tuple(map(A5.beta, range(len(A5))))
+    (0, 3, 4, 1, 2, 5, 6)
+
+    The product of materialized permpairs is also materialized, and
+    agrees with the lazy product.
+    >>> A5_B5 = A5 * B4.materialize()
+    >>> type(A5_B5).__name__, len(A5_B5)
+    ('ArrayPermPair', 49)
+    >>> tuple(A5_B5.iter_relabel(9)) == tuple((A4 * B4).iter_relabel(9))
+    True
+
+    A product with a lazy permpair is lazy.
+    >>> type(A5 * B4).__name__
+    'PermPair'
+
+    Build from the interleaved output of iter_relabel.
+    >>> A6 = ArrayPermPair.from_iterable(A4.iter_relabel(6))
+    >>> tuple(A6.iter_relabel(0)) == tuple(A4.iter_relabel(6))
+    True
+    '''
+
+    __slots__ = 'alpha_array', 'beta_array'
+
+    def __init__(self, alpha_array, beta_array):
+
+        if len(alpha_array) != len(beta_array):
+            raise ValueError
+
+        self.alpha_array = alpha_array
+        self.beta_array = beta_array
+        PermPair.__init__(
+            self,
+            alpha_array.__getitem__,
+            beta_array.__getitem__,
+            len(alpha_array),
+        )
+
+
+    @classmethod
+    def from_iterable(cls, ints):
+        '''Create from interleaved alpha, beta values.'''
+
+        ints = array('L', ints)
+        return cls(ints[::2], ints[1::2])
+
+
+    @classmethod
+    def from_relabel(cls, permpair, root):
+        '''Create from relabelling of permpair from root.
+
+        This is ArrayPermPair.from_iterable(permpair.iter_relabel(root)),
+        but for array-backed permpairs it runs at memory-copy speed.
+        >>> A6 = ArrayPermPair.from_relabel(A4.materialize(), 6)
+        >>> tuple(A6.iter_relabel(0)) == tuple(A4.iter_relabel(6))
+        True
+        '''
+
+        with instrument.stage('relabel'):
+            out = array('L', [0]) * (2 * len(permpair))
+            count = permpair.relabel_into(root, out, Relabel(len(permpair)))
+            del out[count:]
+            return cls(out[::2], out[1::2])
+
+
+    def __reduce__(self):
+
+        # Memoryviews, as from load_permpair, can't be pickled.
+        return ArrayPermPair, (
+            _picklable(self.alpha_array),
+            _picklable(self.beta_array),
+        )
+
+
+    def materialize(self):
+        return self
+
+
+    def __mul__(self, other):
+
+        if isinstance(other, ProductPermPair):
+            return ProductPermPair((self,) + other.factors)
+        elif not isinstance(other, ArrayPermPair):
+            return PermPair.__mul__(self, other)
+
+        with instrument.stage('product'):
+            return ArrayPermPair(
+                cartprod_array(self.alpha_array, other.alpha_array),
+                cartprod_array(self.beta_array, other.beta_array),
+            )
+
+
+    def iter_relabel(self, root):
+
+        # As PermPair.iter_relabel, but index the arrays directly. The
+        # values are yielded as found, so a caller that streams them,
+        # or stops early, needs only the relabelling tables.
+        alphas = self.alpha_array
+        betas = self.beta_array
+        relabel = Relabel(self.length)
+        forward = relabel.forward
+        backward = relabel.backward
+        forward(root)           # Seed the relabelling.
+
+        done = 0
+        try:
+            for new_label in range(self.length):
+
+                # Stop when we run out of new labels.
+                if new_label >= relabel.size:
+                    break
+
+                old_label = backward(new_label)
+                done += 1
+                yield forward(alphas[old_label])
+                yield forward(betas[old_label])
+        finally:
+            instrument.count('alpha_beta', 2 * done)
+
+
+    def relabel_into(self, root, out, relabel):
+        '''Write relabelling from root into out, return count written.
 
-            # Stop when we run out of new labels.
-            if new_label >= relabel.size:
-                break
+        Reuse out and relabel, to avoid allocating for each root.
+        >>> A5 = A4.materialize()
+        >>> out, relabel = array('L', [0]) * 14, Relabel(7)
+        >>> sizes = [A5.relabel_into(i, out, relabel) // 2 for i in range(7)]
+        >>> sizes, tuple(out) == tuple(A4.iter_relabel(6))
+        ([7, 7, 7, 7, 7, 7, 7], True)
+        '''
 
-            old_label = relabel.backward(new_label)
-            old_alpha = self.alpha(old_label)
-            old_beta = self.beta(old_label)
+        return relabel_into(self.alpha_array, self.beta_array, root, out, relabel)
 
-            yield relabel.forward(old_alpha)
-            yield relabel.forward(old_beta)
+
+    def iter_relabel_chunks(self, root, chunk_size=CHUNK_SIZE):
+
+        return iter_relabel_chunks(
+            self.alpha_array, self.beta_array, root,
+            Relabel(self.length), chunk_size,
+        )
+
+
+class ProductPermPair(PermPair):
+    '''Product of many permpairs, as one flat mixed-radix structure.
+
+    The edge (i, j, ..., k) of the product is the number with digits
+    i, j, ..., k, in the mixed radix given by the factor lengths. Each
+    lookup decodes the digits in one loop, rather than going through
+    a chain of nested products.
+    >>> AAA = power(A4, 7)
+    >>> len(AAA), len(AAA.factors)
+    (823543, 7)
+    >>> magic = sum(i * 7 ** i for i in range(7))
+    >>> AAA.alpha(magic) == (A4 * A4 * A4 * A4 * A4 * A4 * A4).alpha(magic)
+    True
+
+    Further products stay flat, also with materialized factors.
+    >>> len((AAA * A4).factors), len((A4 * AAA).factors)
+    (8, 8)
+    >>> A5 = A4.materialize()
+    >>> len((AAA * A5).factors), len((A5 * AAA).factors)
+    (8, 8)
+
+    Materializing the product fills the arrays in one step.
+    >>> AA = power(A4, 2).materialize()
+    >>> AA.alpha_array == (A4.materialize() * A4.materialize()).alpha_array
+    True
+    '''
+
+    __slots__ = 'factors',
+
+    def __init__(self, factors):
+
+        self.factors = tuple(factors)
+        for factor in self.factors:
+            if not isinstance(factor, PermPair):
+                raise ValueError
+
+        # For each factor, from the last, its length and scaled values.
+        sizes = []
+        alphas = []
+        betas = []
+        scale = 1
+        for factor in reversed(self.factors):
+            edges = range(len(factor))
+            sizes.append(len(factor))
+            alphas.append(tuple(scale * factor.alpha(i) for i in edges))
+            betas.append(tuple(scale * factor.beta(i) for i in edges))
+            scale *= len(factor)
+
+        PermPair.__init__(
+            self,
+            _mixed_radix_lookup(tuple(zip(sizes, alphas))),
+            _mixed_radix_lookup(tuple(zip(sizes, betas))),
+            scale,
+        )
+
+
+    def __mul__(self, other):
+
+        if not isinstance(other, PermPair):
+            raise ValueError
+        elif isinstance(other, ProductPermPair):
+            return ProductPermPair(self.factors + other.factors)
+        else:
+            return ProductPermPair(self.factors + (other,))
+
+
+    def __rmul__(self, other):
+
+        if not isinstance(other, PermPair):
+            raise ValueError
+        return ProductPermPair((other,) + self.factors)
+
+
+    def materialize(self):
+
+        factors = [factor.materialize() for factor in self.factors]
+        with instrument.stage('product'):
+            return ArrayPermPair(
+                cartprod_array(*(factor.alpha_array for factor in factors)),
+                cartprod_array(*(factor.beta_array for factor in factors)),
+            )
+
+
+def _picklable(seq):
+
+    if isinstance(seq, memoryview):
+        return array(seq.format, seq)
+    else:
+        return seq
+
+
+def _mixed_radix_lookup(sizes_tables):
+    '''Return function that decodes digits, and sums table values.'''
+
+    def lookup(edge):
+
+        value = 0
+        for size, table in sizes_tables:
+            edge, digit = divmod(edge, size)
+            value += table[digit]
+        return value
+
+    return lookup
+
+
+def power(permpair, exponent):
+    '''Return permpair * ... * permpair, as a flat product.'''
+
+    return ProductPermPair((permpair,) * exponent)
 
 
 A4 = PermPair(*A3)
 B4 = PermPair(*B3)
 
 
+_lazy = LazyConstants(__name__)
+__getattr__ = _lazy.module_getattr
+
+
+def __dir__():
+    return _lazy.module_dir(globals())
+
+
+@_lazy.define('A_top', 'B_top')
 def doit2():
 
-    AAA = A4 * A4 * A4 * A4 * A4 * A4 * A4
-    BBB = B4 * B4 * B4 * B4 * B4 * B4 * B4
+    AAA = power(A4, 7).materialize()
+    BBB = power(B4, 7).materialize()
     magic = sum(i * 7 ** i for i in range(7))
 
-    A_top = PermPair(*aaa_from_bytes(bytes_from_ints('L', AAA.iter_relabel(magic))))
-    B_top = PermPair(*aaa_from_bytes(bytes_from_ints('L', BBB.iter_relabel(magic))))
+    A_top = ArrayPermPair.from_relabel(AAA, magic)
+    B_top = ArrayPermPair.from_relabel(BBB, magic)
 
     return A_top, B_top
 
-
-A_top, B_top = doit2()
@@ -0,0 +1,91 @@
+'''Tests for dessins.binfile'''
+
+import pytest
+
+
+def test_imports():
+
+    import dessins.binfile
+    from dessins.binfile import save_permpair
+    from dessins.binfile import save_interleaved
+    from dessins.binfile import load_permpair
+    from dessins.binfile import read_header
+
+
+def test_round_trip(tmp_path):
+
+    from dessins.binfile import INTERLEAVED, PLANAR
+    from dessins.binfile import load_permpair, read_header, save_permpair
+    from dessins.work import A4, B4
+
+    path = str(tmp_path / 'AB.dessin')
+    permpair = A4 * B4          # A lazy product.
+    edges = range(len(permpair))
+    for width in None, 2, 8:
+        for layout in PLANAR, INTERLEAVED:
+            save_permpair(path, permpair, width=width, layout=layout)
+            header = read_header(path)
+            assert header['degree'] == 49
+            assert header['width'] == (width or 1)
+
+            loaded = load_permpair(path)
+            assert list(map(loaded.alpha, edges)) == list(map(permpair.alpha, edges))
+            assert list(map(loaded.beta, edges)) == list(map(permpair.beta, edges))
+
+
+def test_bad_files(tmp_path):
+
+    from dessins.binfile import FormatError
+    from dessins.binfile import load_permpair, save_permpair
+    from dessins.work import A4
+
+    path = tmp_path / 'A.dessin'
+    save_permpair(str(path), A4)
+
+    # Corrupt the payload.
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 1
+    path.write_bytes(data)
+    with pytest.raises(FormatError):
+        load_permpair(str(path))
+    load_permpair(str(path), verify=False)
+
+    path.write_bytes(b'Not a dessin' * 4)
+    with pytest.raises(FormatError):
+        load_permpair(str(path))
+
+    # Empty, or shorter than the header.
+    for data in b'', b'DESN':
+        path.write_bytes(data)
+        with pytest.raises(FormatError):
+            load_permpair(str(path))
+
+
+def test_pickle(tmp_path):
+
+    import pickle
+    from dessins.binfile import load_permpair, save_permpair
+    from dessins.work import A4
+
+    # Backed by memoryviews of the map, which are copied to arrays.
+    for layout in 0, 1:
+        path = str(tmp_path / 'A.dessin')
+        save_permpair(path, A4, layout=layout)
+        permpair = pickle.loads(pickle.dumps(load_permpair(path)))
+        assert tuple(permpair.iter_relabel(0)) == tuple(A4.iter_relabel(0))
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+
+    import os
+    from dessins.binfile import save_interleaved, save_permpair
+    from dessins.computations import AAAA_0
+
+    path = str(tmp_path / 'A.dessin')
+    with pytest.raises(ValueError):
+        save_permpair(path, AAAA_0, width=1)
+    with pytest.raises(OverflowError):
+        save_interleaved(path, [0, 300], width=1)
+    with pytest.raises(ValueError):
+        save_interleaved(path, [0, 1, 2])
+    assert os.listdir(str(tmp_path)) == []
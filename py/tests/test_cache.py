@@ -0,0 +1,85 @@
+'''Tests for dessins.cache'''
+
+import pytest
+
+
+def test_imports():
+
+    import dessins.cache
+    from dessins.cache import ProductCache
+
+
+def test_isomorphic_factors_hit():
+
+    from dessins.cache import ProductCache
+    from dessins.computations import AA_0, A
+    from dessins.decompose import decompose
+    from dessins.work import A4, ArrayPermPair
+
+    cache = ProductCache()
+    first = cache.decompose(AA_0, A)
+
+    # Relabelled factors, in the other order.
+    AA_0_5 = ArrayPermPair.from_relabel(AA_0, 5)
+    assert cache.decompose(A4, AA_0_5) is first
+    assert cache.stats()['hits'] == 1
+
+    def forms(decomposition):
+        return [(tuple(d.iter_relabel(0)), count) for d, count in decomposition]
+    assert forms(first) == forms(decompose(AA_0 * A))
+
+
+def test_eviction():
+
+    from dessins.cache import ProductCache
+    from dessins.computations import AA_0, BB_0, A, B
+
+    cache = ProductCache(max_edges=600)
+    cache.product(AA_0, A)      # 294 edges.
+    cache.product(BB_0, B)      # 294 edges.
+    cache.product(AA_0, A)      # A hit, so now the newest.
+    cache.product(A, B)         # 49 edges, so evicts BB_0 * B.
+    assert cache.stats() == dict(
+        hits=1, misses=3, evictions=1, entries=2, dessins=0, edges=343)
+
+    cache.product(AA_0, A)
+    assert cache.hits == 2
+
+    # Too large to keep at all.
+    small = ProductCache(max_edges=10)
+    small.product(A, B)
+    assert len(small) == 0
+
+
+def test_disconnected():
+
+    from dessins.cache import ProductCache
+    from dessins.computations import AA, A
+
+    with pytest.raises(ValueError):
+        ProductCache().product(AA, A)
+
+
+def test_dessins_evicted_with_entries():
+
+    from dessins.cache import ProductCache
+    from dessins.computations import AA_0, BB_0, A, B
+
+    # Each of the first two decompositions holds 42 + 210 edges.
+    cache = ProductCache(max_edges=500)
+    first = cache.decompose(AA_0, A)
+    assert cache.stats()['dessins'] == 2 and cache.edges == 252
+    cache.decompose(BB_0, B)
+    cache.decompose(A, B)
+    stats = cache.stats()
+    assert stats['evictions'] >= 1
+    assert cache.edges <= 500
+
+    # The edges counted are those of the dessins held, each once.
+    held = {id(d): len(d) for value, edges, hashes in cache._entries.values()
+            for d, count in value}
+    assert cache.edges == sum(held.values())
+    assert stats['dessins'] == len(held)
+
+    cache.clear()
+    assert cache.stats()['dessins'] == 0 and cache.edges == 0
@@ -0,0 +1,77 @@
+'''Tests for dessins.canonical'''
+
+import itertools
+
+
+def test_imports():
+
+    import dessins.canonical
+    from dessins.canonical import canonical_form
+
+
+def test_canonical_form():
+
+    from array import array
+    from dessins.canonical import canonical_form
+    from dessins.work import ArrayPermPair
+
+    # Compare with sorting every relabelling, for all small permpairs.
+    for size in range(5):
+        perms = list(itertools.permutations(range(size)))
+        for alpha, beta in itertools.product(perms, repeat=2):
+
+            permpair = ArrayPermPair(array('L', alpha), array('L', beta))
+            relabels = sorted(
+                (tuple(permpair.iter_relabel(i)), i) for i in range(size)
+            )
+
+            canon, orbit = canonical_form(permpair)
+            if size:
+                assert canon == relabels[0][0]
+            assert orbit == tuple(i for t, i in relabels if t == canon)
+
+            # Restricting the roots.
+            roots = range(size - 1, -1, -2)
+            canon, orbit = canonical_form(permpair, roots)
+            relabels = [pair for pair in relabels if pair[1] in roots]
+            if relabels:
+                assert canon == relabels[0][0]
+            assert orbit == tuple(i for t, i in relabels if t == canon)
+
+
+def test_automorphisms():
+
+    from array import array
+    from dessins.canonical import automorphisms
+    from dessins.canonical import automorphism_generators
+    from dessins.components import components
+    from dessins.work import ArrayPermPair
+
+    size = 4
+    perms = list(itertools.permutations(range(size)))
+    for alpha, beta in itertools.product(perms, repeat=2):
+
+        permpair = ArrayPermPair(array('L', alpha), array('L', beta))
+        if len(components(permpair)[1]) != 1:
+            continue
+
+        # Every automorphism commutes with alpha and beta.
+        autos = list(automorphisms(permpair))
+        for auto in autos:
+            for edge in range(size):
+                assert auto[alpha[edge]] == alpha[auto[edge]]
+                assert auto[beta[edge]] == beta[auto[edge]]
+
+        # The generators generate the whole group.
+        group = {tuple(range(size))}
+        todo = list(group)
+        generators = automorphism_generators(permpair)
+        while todo:
+            elt = todo.pop()
+            for gen in generators:
+                new = tuple(gen[i] for i in elt)
+                if new not in group:
+                    group.add(new)
+                    todo.append(new)
+
+        assert group == set(map(tuple, autos))
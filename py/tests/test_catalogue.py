@@ -0,0 +1,48 @@
+'''Tests for dessins.catalogue'''
+
+import pytest
+
+
+def test_imports():
+
+    import dessins.catalogue
+    from dessins.catalogue import Catalogue
+
+
+def test_persistence(tmp_path):
+
+    from dessins.catalogue import Catalogue
+    from dessins.computations import AA_0, AB_0, A, B
+    from dessins.work import A4
+
+    path = str(tmp_path / 'dessins.sqlite')
+    with Catalogue(path) as catalogue:
+        ids = catalogue.add_many([A, B, AA_0, A4])
+        assert ids == [1, 2, 3, 1]
+        catalogue.decompose('A*B', A * B)
+
+    with Catalogue(path) as catalogue:
+        assert len(catalogue) == 4
+        assert catalogue.lookup(A4) == 1
+        assert catalogue.lookup(AB_0) == 4
+
+        # The stored dessin is the canonical form.
+        dessin = catalogue.dessin(3)
+        assert tuple(dessin.iter_relabel(0)) == min(
+            tuple(AA_0.iter_relabel(i)) for i in range(len(AA_0)))
+
+        [(dessin, count)] = catalogue.decomposition('A*B')
+        assert (len(dessin), count) == (49, 1)
+
+
+def test_disconnected():
+
+    from dessins.catalogue import Catalogue
+    from dessins.computations import A
+    from dessins.work import ArrayPermPair
+
+    # The whole batch is refused, and nothing is stored.
+    catalogue = Catalogue()
+    with pytest.raises(ValueError):
+        catalogue.add_many([A, ArrayPermPair([1, 0, 2], [1, 0, 2])])
+    assert len(catalogue) == 0
@@ -0,0 +1,53 @@
+'''Tests for dessins.codec'''
+
+import pytest
+
+
+def test_imports():
+
+    import dessins.codec
+    from dessins.codec import iter_encode
+    from dessins.codec import iter_decode
+    from dessins.codec import encode_permpair
+    from dessins.codec import decode_permpair
+    from dessins.codec import digest
+
+
+def test_round_trip():
+
+    import random
+    from dessins.codec import iter_decode, iter_encode
+
+    rng = random.Random(1)
+    ints = [rng.randrange(2 ** 40) for i in range(1000)]
+    ints += [0, 1, 127, 128, 2 ** 63]
+    for delta in True, False:
+        for compress in True, False:
+            for text in True, False:
+                chunks = list(iter_encode(ints, delta, compress, text))
+                assert list(iter_decode(chunks)) == ints
+
+
+def test_python_matches_numpy(monkeypatch):
+
+    import dessins.codec
+    from dessins.codec import decode_permpair, encode_permpair
+    from dessins.computations import AAA_0, A
+
+    permpair = AAA_0 * A
+    data = encode_permpair(permpair)
+    monkeypatch.setattr(dessins.codec, 'numpy', None)
+    assert encode_permpair(permpair) == data
+    assert decode_permpair(data).alpha_array == permpair.alpha_array
+
+
+def test_bad_streams():
+
+    from dessins.codec import FormatError
+    from dessins.codec import decode_permpair, encode_permpair
+    from dessins.work import A4
+
+    data = encode_permpair(A4, compress=True)
+    for bad in b'', b'XX\x01\x00', data[:-2], b'DV\x01\x00\x80':
+        with pytest.raises(FormatError):
+            decode_permpair(bad)
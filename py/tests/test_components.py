@@ -0,0 +1,34 @@
+'''Tests for dessins.components'''
+
+import itertools
+
+
+def test_imports():
+
+    import dessins.components
+    from dessins.components import components
+    from dessins.components import component_roots
+
+
+def test_components():
+
+    from array import array
+    from dessins import components as module
+    from dessins.components import components
+    from dessins.work import ArrayPermPair
+
+    def sizes_by_root(permpair):
+        # The slow way: a search from every root.
+        return [len(tuple(permpair.iter_relabel(i)))//2
+                for i in range(len(permpair))]
+
+    for alpha in itertools.permutations(range(4)):
+        for beta in itertools.permutations(range(4)):
+            permpair = ArrayPermPair(array('L', alpha), array('L', beta))
+            labels, sizes = components(permpair)
+            assert [sizes[i] for i in labels] == sizes_by_root(permpair)
+
+            # The lazy path agrees with the array path.
+            lazy = module._components_python(
+                permpair.alpha, permpair.beta, len(permpair))
+            assert lazy == (labels, sizes)
@@ -0,0 +1,42 @@
+'''Tests for dessins.decompose'''
+
+
+def test_imports():
+
+    import dessins.decompose
+    from dessins.decompose import decompose
+    from dessins.decompose import decompose_product
+    from dessins.decompose import intern_dessin
+
+
+def test_memo(monkeypatch):
+
+    import dessins.decompose
+    from dessins.computations import AA_0, A, B
+    from dessins.decompose import clear_memo
+    from dessins.decompose import decompose
+    from dessins.decompose import decompose_product
+    from dessins.decompose import memo_stats
+
+    def forms(decomposition):
+        return [(tuple(d.iter_relabel(0)), count) for d, count in decomposition]
+
+    clear_memo()
+    expect = forms(decompose(AA_0 * A))
+    assert forms(decompose_product(AA_0, A)) == expect
+    assert forms(decompose_product(A, AA_0)) == expect
+    assert forms(decompose_product(A, AA_0, memo=False)) == expect
+    assert memo_stats()['hits'] == 1
+    assert memo_stats()['misses'] == 1
+
+    # A small memo keeps only the entry used last. The decomposition
+    # of A * B has 126 values, counting the key.
+    monkeypatch.setattr(dessins.decompose, 'MEMO_VALUES', 200)
+    decompose_product(A, B)
+    assert memo_stats()['entries'] == 1
+    decompose_product(A, A)
+    assert memo_stats()['entries'] == 1
+    assert memo_stats()['values'] <= 200
+    decompose_product(A, A)
+    assert memo_stats()['hits'] == 2
+    clear_memo()
@@ -0,0 +1,56 @@
+'''Tests for dessins.generate'''
+
+
+def test_imports():
+
+    import dessins.generate
+    from dessins.generate import iter_dessins
+    from dessins.generate import iter_prefixes
+    from dessins.generate import count_dessins
+
+
+def test_canonical_and_complete():
+
+    from dessins.canonical import canonical_form
+    from dessins.generate import COUNTS, iter_dessins
+    from dessins.work import ArrayPermPair
+
+    # Counting rooted dessins, each class counts degree / |Aut| times.
+    # These are the indecomposable permutations, OEIS A003319.
+    rooted = {1: 1, 2: 3, 3: 13, 4: 71, 5: 461, 6: 3447}
+    for degree in range(1, 7):
+        canons = list(iter_dessins(degree))
+        assert len(canons) == COUNTS[degree]
+        assert canons == sorted(set(canons))
+
+        total = 0
+        for canon in canons:
+            permpair = ArrayPermPair.from_iterable(canon)
+            value, orbit = canonical_form(permpair)
+            assert value == canon
+            total += degree // len(orbit)
+        assert total == rooted[degree]
+
+
+def test_split():
+
+    from dessins.generate import iter_dessins, iter_prefixes
+
+    for length in range(0, 9):
+        canons = []
+        for prefix in iter_prefixes(5, length):
+            canons.extend(iter_dessins(5, prefix))
+        assert canons == list(iter_dessins(5))
+
+    assert list(iter_dessins(5, (0, 0))) == []
+
+
+def test_products_are_found():
+
+    from dessins.canonical import canonical_form
+    from dessins.computations import A, B
+    from dessins.generate import iter_dessins
+
+    canons = set(iter_dessins(7))
+    assert canonical_form(A)[0] in canons
+    assert canonical_form(B)[0] in canons
@@ -0,0 +1,95 @@
+'''Tests for dessins.instrument'''
+
+
+def test_imports():
+
+    import dessins.instrument
+    from dessins.instrument import instrumented
+    from dessins.instrument import stage
+    from dessins.instrument import count
+
+
+def test_off_by_default():
+
+    import dessins.instrument
+    from dessins.instrument import instrumented
+    from dessins.work import A4
+
+    with instrumented() as recorder:
+        pass
+    tuple(A4.iter_relabel(0))
+    assert dessins.instrument._recorder is None
+    assert not recorder.counters
+
+
+def test_counts_and_nesting():
+
+    from array import array
+    from dessins.instrument import instrumented, stage
+    from dessins.permtools import iter_cycles
+    from dessins.work import A4
+
+    with instrumented(memory=True) as recorder:
+        with stage('outer'):
+            big = array('L', [0]) * 100000
+            del big
+            with stage('inner'):
+                assert len(tuple(A4.iter_relabel(3))) == 14
+                cycles = list(iter_cycles((1, 2, 0, 3)))
+
+    assert recorder.counters['alpha_beta'] == 14
+    assert recorder.counters['cycles'] == 2
+    stages = recorder.report()['stages']
+    assert stages['inner']['calls'] == stages['outer']['calls'] == 1
+
+    # The outer peak includes the array freed before the inner stage.
+    assert stages['outer']['peak'] >= 800000 > stages['inner']['peak']
+
+
+def test_environment(tmp_path):
+
+    import json
+    import os
+    import subprocess
+    import sys
+
+    path = tmp_path / 'report.json'
+    env = dict(os.environ, DESSINS_INSTRUMENT=str(path))
+    code = 'from dessins.computations import AA_0; AA_0.materialize()'
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.check_call([sys.executable, '-c', code], env=env, cwd=cwd)
+
+    report = json.loads(path.read_text())
+    assert report['format_version'] == 1
+    assert report['counters']['relabel_forward'] > 0
+    assert 'relabel' in report['stages']
+
+
+def test_relabel_and_early_stop():
+
+    from dessins.instrument import instrumented
+    from dessins.permtools import iter_cycles
+    from dessins.permtools import Relabel
+    from dessins.work import A4
+
+    with instrumented() as recorder:
+        relabel = Relabel(10)
+        relabel.forward(4), relabel.forward(4), relabel.backward(0)
+
+        # A caller that stops early still has its work counted.
+        for cycle in iter_cycles((1, 0, 3, 2, 4)):
+            break
+        for value in A4.iter_relabel(0):
+            break
+
+    assert recorder.counters['relabel_forward'] == 2 + 2
+    assert recorder.counters['relabel_backward'] == 1 + 1
+    assert recorder.counters['cycles'] == 1
+    assert recorder.counters['perm_lookups'] == 2
+    assert recorder.counters['alpha_beta'] == 2
+
+    # Made while off, so not counted.
+    relabel = Relabel(10)
+    with instrumented() as recorder:
+        relabel.forward(4)
+    assert not recorder.counters['relabel_forward']
@@ -0,0 +1,81 @@
+'''Tests for dessins.invariants'''
+
+import itertools
+
+import pytest
+
+
+def test_imports():
+
+    import dessins.invariants
+    from dessins.invariants import fingerprint
+    from dessins.invariants import FingerprintIndex
+
+
+def test_fingerprint_is_invariant():
+
+    from array import array
+    import random
+    from dessins.invariants import fingerprint
+    from dessins.work import ArrayPermPair
+
+    rng = random.Random(1)
+    for i in range(20):
+        size = rng.randrange(1, 30)
+        alpha = rng.sample(range(size), size)
+        beta = rng.sample(range(size), size)
+
+        # Conjugate by a random relabelling.
+        new = rng.sample(range(size), size)
+        alpha2 = [0] * size
+        beta2 = [0] * size
+        for edge in range(size):
+            alpha2[new[edge]] = new[alpha[edge]]
+            beta2[new[edge]] = new[beta[edge]]
+
+        permpair = ArrayPermPair(array('L', alpha), array('L', beta))
+        permpair2 = ArrayPermPair(array('L', alpha2), array('L', beta2))
+        assert fingerprint(permpair) == fingerprint(permpair2)
+
+        # Genus is never negative.
+        assert fingerprint(permpair)[2] >= 0
+
+
+def test_index_classes():
+
+    from array import array
+    from dessins.canonical import canonical_form
+    from dessins.components import components
+    from dessins.invariants import FingerprintIndex
+    from dessins.work import ArrayPermPair
+
+    # Isomorphism classes of all connected permpairs of degree 4.
+    index = FingerprintIndex()
+    canons = set()
+    perms = list(itertools.permutations(range(4)))
+    for alpha, beta in itertools.product(perms, repeat=2):
+        permpair = ArrayPermPair(array('L', alpha), array('L', beta))
+        if len(components(permpair)[1]) != 1:
+            continue
+        canons.add(canonical_form(permpair)[0])
+        index.add(permpair, None)
+
+    assert len(index) == len(canons)
+
+
+def test_index_disconnected():
+
+    from dessins.invariants import FingerprintIndex
+    from dessins.work import ArrayPermPair
+
+    index = FingerprintIndex()
+    index.add(ArrayPermPair([1, 0], [1, 0]), 'edge')
+
+    # Two disconnected permpairs, whose smallest components agree.
+    first = ArrayPermPair([0, 1, 5, 3, 2, 4], [0, 5, 1, 2, 3, 4])
+    second = ArrayPermPair([0, 2, 3, 1, 4, 5], [0, 2, 3, 4, 5, 1])
+    with pytest.raises(ValueError):
+        index.add(first, 'first')
+    with pytest.raises(ValueError):
+        index.get(second)
+    assert len(index) == 1
@@ -0,0 +1,92 @@
+'''Tests for dessins.lazy'''
+
+
+def test_imports():
+
+    import dessins.lazy
+    from dessins.lazy import LazyConstants
+
+
+def test_disk_cache(tmp_path, monkeypatch):
+
+    from dessins.lazy import LazyConstants
+
+    monkeypatch.setenv('DESSINS_CACHE', str(tmp_path))
+    calls = []
+
+    def make():
+        lazy = LazyConstants('example')
+
+        @lazy.define('ONE')
+        def _():
+            calls.append('ONE')
+            return 1
+
+        @lazy.define('TWO')
+        def _(ONE):
+            calls.append('TWO')
+            return [ONE, ONE]
+
+        return lazy
+
+    # First process computes, and writes to the cache.
+    assert make().get('TWO') == [1, 1]
+    assert calls == ['ONE', 'TWO']
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # Later processes read from the cache.
+    assert make().get('TWO') == [1, 1]
+    assert calls == ['ONE', 'TWO']
+
+
+def test_no_source(tmp_path, monkeypatch):
+
+    from dessins.lazy import LazyConstants
+
+    monkeypatch.setenv('DESSINS_CACHE', str(tmp_path))
+    lazy = LazyConstants('example')
+
+    # As in a REPL, inspect can't find the source.
+    namespace = {}
+    exec('def one():\n    return 1\n', namespace)
+    lazy.define('ONE')(namespace['one'])
+
+    assert lazy.get('ONE') == 1
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # A change of constant is a change of key.
+    other = LazyConstants('example')
+    exec('def one():\n    return 2\n', namespace)
+    other.define('ONE')(namespace['one'])
+    assert other.key('ONE') != lazy.key('ONE')
+
+
+def test_bad_cache_file(tmp_path, monkeypatch):
+
+    import pickle
+    from dessins.lazy import LazyConstants
+
+    monkeypatch.setenv('DESSINS_CACHE', str(tmp_path))
+
+    def make():
+        lazy = LazyConstants('example')
+
+        @lazy.define('ONE')
+        def _():
+            return 1
+
+        return lazy
+
+    # A truncated pickle is recomputed, and replaced.
+    path = tmp_path / (make().key('ONE') + '.pickle')
+    path.write_bytes(b'\x80\x05\x95')
+    assert make().get('ONE') == 1
+    with open(path, 'rb') as f:
+        assert pickle.load(f) == (1,)
+
+    # So is one that refers to a module or class no longer there.
+    for module, name in ('no_such_module', 'X'), ('dessins.lazy', 'NoSuchClass'):
+        data = pickle.dumps(1, 2).replace(
+            b'K\x01', b'c%s\n%s\n' % (module.encode(), name.encode()))
+        path.write_bytes(data)
+        assert make().get('ONE') == 1
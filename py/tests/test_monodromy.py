@@ -0,0 +1,91 @@
+'''Tests for dessins.monodromy'''
+
+
+def test_imports():
+
+    import dessins.monodromy
+    from dessins.monodromy import PermGroup
+    from dessins.monodromy import monodromy_group
+
+
+def _closure(generators):
+    '''Return set of all products of generators, by brute force.'''
+
+    identity = tuple(range(len(generators[0])))
+    elements = {identity}
+    todo = [identity]
+    for perm in todo:           # Grows as we go.
+        for gen in generators:
+            product = tuple(gen[i] for i in perm)
+            if product not in elements:
+                elements.add(product)
+                todo.append(product)
+
+    return elements
+
+
+def _check_random_groups():
+
+    import itertools
+    import random
+    from dessins.monodromy import PermGroup
+
+    rng = random.Random(1)
+    for degree in range(1, 7):
+        for count in range(1, 4):
+            gens = [tuple(rng.sample(range(degree), degree))
+                    for i in range(count)]
+            group = PermGroup(gens)
+            elements = _closure(gens)
+            assert group.order() == len(elements)
+            for perm in itertools.permutations(range(degree)):
+                assert (perm in group) == (perm in elements)
+
+
+def test_random_groups():
+
+    _check_random_groups()
+
+
+def test_random_groups_python(monkeypatch):
+
+    import dessins.permalgebra
+    monkeypatch.setattr(dessins.permalgebra, 'numpy', None)
+    _check_random_groups()
+
+
+def test_imprimitive():
+
+    from dessins.monodromy import PermGroup
+
+    # The wreath product of S_2 by S_3, of order 2**3 * 6.
+    gens = [
+        [1, 0, 2, 3, 4, 5],
+        [2, 3, 4, 5, 0, 1],
+        [2, 3, 0, 1, 4, 5],
+    ]
+    group = PermGroup(gens, seed=0)
+    assert group.order() == 48
+    assert [0, 1, 2, 3, 5, 4] in group
+    assert [0, 2, 1, 3, 4, 5] not in group
+
+
+def test_product_groups():
+
+    from dessins.computations import AA_0, AB_0
+    from dessins.monodromy import monodromy_group
+
+    # AA_0 is a component of a product, so its group is a quotient of
+    # the group of A. And A7 is simple.
+    assert monodromy_group(AA_0).order() == 2520
+    assert monodromy_group(AB_0).order() % 2520 == 0
+
+
+def test_trivial_group():
+
+    from dessins.monodromy import PermGroup
+
+    for group in PermGroup([], degree=3), PermGroup([[0, 1, 2], [0, 1, 2]]):
+        assert group.order() == 1
+        assert [0, 1, 2] in group
+        assert [1, 0, 2] not in group
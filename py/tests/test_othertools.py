@@ -7,6 +7,7 @@ def test_imports():
     from dessins.othertools import bytes_from_str62
     from dessins.othertools import str62_from_bytes
     from dessins.othertools import SetDiff
+    from dessins.othertools import atomic_write
 
 
 def test_bytes_to_and_from_str62():
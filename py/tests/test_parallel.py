@@ -0,0 +1,21 @@
+'''Tests for dessins.parallel'''
+
+
+def test_imports():
+
+    import dessins.parallel
+    from dessins.parallel import parallel_canonical_form
+
+
+def test_parallel_canonical_form():
+
+    from dessins.canonical import canonical_form
+    from dessins.computations import AAA_0
+    from dessins.parallel import parallel_canonical_form
+
+    # The orbit of AAA_0 is (0, 61, 82, 118, 124, 208), so with eight
+    # ranges it is spread over five of them.
+    expect = canonical_form(AAA_0)
+    assert len(expect[1]) == 6
+    for chunks in 2, 8, 32:
+        assert parallel_canonical_form(AAA_0, 2, chunks) == expect
@@ -0,0 +1,100 @@
+'''Tests for dessins.permalgebra'''
+
+import pytest
+
+
+def test_imports():
+
+    import dessins.permalgebra
+    from dessins.permalgebra import compose
+    from dessins.permalgebra import invert
+    from dessins.permalgebra import power
+    from dessins.permalgebra import conjugate
+    from dessins.permalgebra import cycle_type_of_product
+    from dessins.permalgebra import as_perm
+    from dessins.permalgebra import is_identity
+
+
+def _check(perms):
+
+    from array import array
+    from dessins.permalgebra import compose, conjugate, invert, power
+    from dessins.permalgebra import cycle_type_of_product
+    from dessins.permtools import cycle_type
+
+    for p in perms:
+        for q in perms:
+            pq = compose(p, q)
+            assert list(pq) == [q[i] for i in p]
+            assert list(conjugate(p, q)) == list(compose(invert(q), p, q))
+            assert cycle_type_of_product(p, q) == cycle_type(pq)
+
+        identity = list(range(len(p)))
+        assert list(compose(p, invert(p))) == identity
+        assert list(power(p, 0)) == identity
+        value = identity
+        for exponent in range(1, 8):
+            value = [p[i] for i in value]
+            assert list(power(p, exponent)) == value
+            assert list(power(p, -exponent)) == list(invert(value))
+
+
+def test_algebra():
+
+    import random
+    rng = random.Random(1)
+    perms = [rng.sample(range(12), 12) for i in range(6)]
+    _check(perms)
+
+
+def test_algebra_python(monkeypatch):
+
+    import random
+    import dessins.permalgebra
+    monkeypatch.setattr(dessins.permalgebra, 'numpy', None)
+    rng = random.Random(2)
+    perms = [rng.sample(range(12), 12) for i in range(6)]
+    _check(perms)
+
+
+def test_batches():
+
+    import random
+    from dessins.permalgebra import compose, conjugate, invert, power
+    from dessins.permalgebra import cycle_type_of_product
+    numpy = pytest.importorskip('numpy')
+
+    rng = random.Random(3)
+    alphas = numpy.array([rng.sample(range(9), 9) for i in range(50)])
+    betas = numpy.array([rng.sample(range(9), 9) for i in range(50)])
+    by = rng.sample(range(9), 9)
+
+    faces = compose(alphas, betas)
+    types = cycle_type_of_product(alphas, betas)
+    inverses = invert(alphas)
+    cubes = power(alphas, 3)
+    conjugates = conjugate(alphas, by)
+    for i in range(50):
+        assert list(faces[i]) == list(compose(alphas[i], betas[i]))
+        assert types[i] == cycle_type_of_product(list(alphas[i]), list(betas[i]))
+        assert list(inverses[i]) == list(invert(list(alphas[i])))
+        assert list(cubes[i]) == list(power(list(alphas[i]), 3))
+        assert list(conjugates[i]) == list(conjugate(list(alphas[i]), by))
+
+
+def test_numpy_in_numpy_out():
+
+    from array import array
+    from dessins.permalgebra import as_perm, compose, invert, power
+    from dessins.permalgebra import is_identity
+    numpy = pytest.importorskip('numpy')
+
+    p = as_perm([1, 2, 0, 3])
+    assert isinstance(p, numpy.ndarray)
+    for value in compose(p, p), invert(p), power(p, 0), power(p, -2):
+        assert isinstance(value, numpy.ndarray)
+    assert is_identity(power(p, 3))
+    assert not is_identity(p)
+
+    # A mix of numpy and other arguments gives array('L').
+    assert isinstance(compose(p, [0, 1, 2, 3]), array)
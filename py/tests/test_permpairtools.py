@@ -0,0 +1,55 @@
+'''Tests for dessins.permpairtools'''
+
+import pytest
+
+
+def test_imports():
+
+    import dessins.permpairtools
+    from dessins.permpairtools import group_component_cycles_filter
+    from dessins.permpairtools import iter_component_cycles
+    from dessins.permpairtools import IterCyclesState
+    from dessins.permpairtools import StateError
+
+
+def test_iter_component_cycles_order():
+
+    import random
+    from dessins.permpairtools import iter_component_cycles
+    from dessins.permpairtools import IterCyclesState
+
+    # The order must be that of IterCyclesState.
+    rng = random.Random(1)
+    for size in list(range(6)) * 5 + [50] * 20:
+        perms = [rng.sample(range(size), size) for i in range(2)]
+
+        expect = []
+        state = IterCyclesState(perms)
+        for edge in state.iter_components():
+            expect.append(('S', edge))
+            expect.extend(state.iter_side_cycles())
+            expect.append(('E', edge))
+
+        assert list(iter_component_cycles(perms)) == expect
+
+
+def test_group_component_cycles_filter():
+
+    import random
+    from dessins.components import components
+    from dessins.permpairtools import group_component_cycles_filter
+    from dessins.permpairtools import iter_component_cycles
+    from dessins.work import ArrayPermPair
+
+    # Run to exhaustion. Under PEP 479 a StopIteration escaping the
+    # generator would be a RuntimeError.
+    assert list(group_component_cycles_filter([])) == []
+    rng = random.Random(1)
+    for size in list(range(1, 6)) * 5 + [50] * 20:
+        perms = [rng.sample(range(size), size) for i in range(2)]
+        pairs = list(group_component_cycles_filter(iter_component_cycles(perms)))
+        assert len(pairs) == len(components(ArrayPermPair(*perms))[1])
+
+    # A component that doesn't end is an error, not a RuntimeError.
+    with pytest.raises(ValueError):
+        list(group_component_cycles_filter([('S', 0), ('a', [0])]))
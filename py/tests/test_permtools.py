@@ -13,6 +13,8 @@ def test_import():
     from dessins.permtools import iter_seen_cycle
     from dessins.permtools import iter_cycles
     from dessins.permtools import iter_cartprod
+    from dessins.permtools import cartprod_array
+    from dessins.permtools import iter_relabel_chunks
 
 
 def test_is_perm():
@@ -91,6 +93,39 @@ def test_iter_cycles():
     # TODO: Add some tests.
 
 
+def test_cycles_csr():
+
+    from array import array
+    import random
+    from dessins import permtools
+    from dessins.permtools import cycles_csr
+    from dessins.permtools import cycle_type
+    from dessins.permtools import iter_cycles
+
+    def doit(perm):
+        # As lists of lists, with iter_cycles.
+        return [list(cycle) for cycle in iter_cycles(tuple(perm))]
+
+    perms = [list(item) for i in range(5)
+             for item in itertools.permutations(range(i))]
+    rng = random.Random(1)
+    for i in range(50):
+        perm = list(range(rng.randrange(300)))
+        rng.shuffle(perm)
+        perms.append(perm)
+
+    for perm in perms:
+        expect = doit(perm)
+        for seq in perm, array('L', perm), memoryview(array('H', perm)):
+            values, offsets = cycles_csr(seq)
+            got = [list(values[i:j]) for i, j in zip(offsets, offsets[1:])]
+            assert got == expect
+            assert permtools._cycles_csr_python(seq) == (values, offsets)
+
+        assert cycle_type(bytes(perm[:0])) == ()
+        assert cycle_type(perm) == tuple(sorted(map(len, expect), reverse=True))
+
+
 def test_iter_cartprod():
 
     from dessins.permtools import iter_cartprod
@@ -111,3 +146,59 @@ def test_iter_cartprod():
     # Multiplication is by blocks.
     assert doit('210 0123') == '89ab45670123'
     assert doit('10 0123456789') == 'abcdefghij0123456789'
+
+
+def test_cartprod_array():
+
+    from array import array
+    from dessins import permtools
+    from dessins.permtools import cartprod_array
+    from dessins.permtools import iter_cartprod
+
+    perms_list = [
+        (),
+        ([0],),
+        ([1, 0], [0, 2, 1]),
+        ([1, 2, 0], [0], [1, 0], [3, 0, 2, 1]),
+        (array('L', [2, 0, 1]), bytes([1, 0])),
+    ]
+
+    # Agrees with iter_cartprod, whichever path is taken.
+    for perms in perms_list:
+        expect = array('L', iter_cartprod(*perms))
+        assert cartprod_array(*perms) == expect
+        assert permtools._cartprod_array_python(perms) == expect
+        if permtools.numpy is not None:
+            assert permtools._cartprod_array_numpy(perms) == expect
+
+
+def test_iter_relabel_chunks():
+
+    from array import array
+    import itertools
+    from dessins.permtools import Relabel
+    from dessins.permtools import iter_relabel_chunks
+    from dessins.computations import AAA_0
+    from dessins.work import PermPair
+
+    lazy = PermPair(AAA_0.alpha, AAA_0.beta, len(AAA_0))
+    relabel = Relabel(len(AAA_0))
+    for root in 0, 17:
+        expect = array('L', AAA_0.iter_relabel(root))
+        for chunk_size in 1, 2, 3, 7, 1000:
+            for chunks in (
+                    iter_relabel_chunks(AAA_0.alpha_array, AAA_0.beta_array,
+                                        root, relabel, chunk_size),
+                    lazy.iter_relabel_chunks(root, chunk_size)):
+                got = array('L')
+                for chunk in chunks:
+                    assert 0 < len(chunk) <= chunk_size
+                    got.extend(chunk)
+                assert got == expect
+
+    # Stopping early leaves relabel with the labels found so far.
+    chunks = iter_relabel_chunks(AAA_0.alpha_array, AAA_0.beta_array,
+                                 0, relabel, 4)
+    next(chunks)
+    chunks.close()
+    assert relabel.size <= 5
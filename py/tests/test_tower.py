@@ -0,0 +1,61 @@
+'''Tests for dessins.tower'''
+
+
+def test_imports():
+
+    import dessins.tower
+    from dessins.tower import power_tower
+
+
+def test_matches_computations():
+
+    from dessins.canonical import canonical_form
+    from dessins.computations import AA_0, AAA_0, AAAA_0, AAAAA_0, B
+    from dessins.computations import BB_0, BBB_0, BBBB_0, BBBBB_0, A
+    from dessins.tower import power_tower
+
+    for base, tops in [
+            (A, [A, AA_0, AAA_0, AAAA_0, AAAAA_0]),
+            (B, [B, BB_0, BBB_0, BBBB_0, BBBBB_0]),
+    ]:
+        tower = power_tower(base, 10, interned={})
+        assert len(tower) == 5
+        for (top, decomposition), expected in zip(tower, tops):
+            assert tuple(top.iter_relabel(0)) == canonical_form(expected)[0]
+
+
+def test_resume(tmp_path, monkeypatch):
+
+    import dessins.tower
+    from dessins.computations import A
+    from dessins.tower import power_tower
+
+    calls = []
+    decompose_product = dessins.tower.decompose_product
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return decompose_product(*args, **kwargs)
+    monkeypatch.setattr(dessins.tower, 'decompose_product', counting)
+
+    checkpoint_dir = str(tmp_path)
+    first = power_tower(A, 4, checkpoint_dir, interned={})
+    assert len(calls) == 3
+
+    # A run that died during level 4 left only levels 1 to 3.
+    [path] = tmp_path.glob('tower-*-4.pickle')
+    path.unlink()
+    del calls[:]
+    interned = {}
+    second = power_tower(A, 5, checkpoint_dir, interned=interned)
+    assert len(calls) == 2
+    assert len(second) == 5
+
+    sizes = [[(len(d), count) for d, count in decomposition]
+             for top, decomposition in second[:4]]
+    assert sizes == [[(len(d), count) for d, count in decomposition]
+                     for top, decomposition in first]
+
+    # Reloaded dessins are interned, like computed ones.
+    assert second[2][0] is second[3][1][0][0]
+    assert all(interned[tuple(top.iter_relabel(0))] is top
+               for top, decomposition in second)